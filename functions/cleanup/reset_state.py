@@ -1,9 +1,7 @@
 from azure import functions as func
-from azure.identity import DefaultAzureCredential
 import logging
 
-from shared.configuration_manager import SynchronizerStateManager
-from shared.environment_config import EnvironmentConfig
+from shared.resources import resources
 
 NAME = "reset_state"
 logging.basicConfig(level=logging.INFO)
@@ -15,14 +13,8 @@ bp = func.Blueprint()
 def reset_state(req: func.HttpRequest) -> func.HttpResponse:
     logging.info("Running reset state.")
     
-    # Get credentials.
-    credential = DefaultAzureCredential()
-
-    # Get environment variables.
-    config = EnvironmentConfig()
-
     # Initialize classes needed for syncronizing data.
-    state_manager = SynchronizerStateManager(config.app_config_endpoint, credential)
+    state_manager = resources.create_state_manager()
     state_manager.reset_state()
 
     return func.HttpResponse("State reset successfully.", status_code=200)
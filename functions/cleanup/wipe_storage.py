@@ -1,9 +1,7 @@
 from azure import functions as func
-from azure.identity import DefaultAzureCredential
 import logging
 
-from shared.data_lake_writer import DataLakeWriter
-from shared.environment_config import EnvironmentConfig
+from shared.resources import resources
 
 NAME = "wipe_storage"
 logging.basicConfig(level=logging.INFO)
@@ -15,14 +13,8 @@ bp = func.Blueprint()
 def wipe_storage(req: func.HttpRequest) -> func.HttpResponse:
     logging.info("Running wipe storage.")
     
-    # Get credentials.
-    credential = DefaultAzureCredential()
-
-    # Get environment variables.
-    config = EnvironmentConfig()
-
     # Initialize classes needed for syncronizing data.
-    data_lake_writer = DataLakeWriter(config.data_storage_account, credential, config.data_storage_container)
+    data_lake_writer = resources.create_data_lake_writer()
     data_lake_writer.delete_all_folders()
 
     return func.HttpResponse("Storage wiped successfully.", status_code=200)
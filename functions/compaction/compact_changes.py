@@ -0,0 +1,39 @@
+from azure import functions as func
+import logging
+import importlib
+
+from shared.resources import resources
+from shared.change_compactor import ChangeCompactor
+from functions.orchestrator.syncronize_all import SYNC_JOBS
+
+
+NAME = "compact_changes"
+logging.basicConfig(level=logging.INFO)
+bp = func.Blueprint()
+
+
+@bp.function_name(NAME)
+@bp.schedule(schedule="0 30 2 * * *", arg_name="myTimer", run_on_startup=False,
+              use_monitor=False)
+def compact_changes(myTimer: func.TimerRequest) -> None:
+    config = resources.config
+
+    # Compact the change files of every syncronized entity, with the Parquet options of the entity.
+    failed = []
+    for name in SYNC_JOBS:
+        queries = importlib.import_module(f"functions.{name}.queries")
+        compactor = ChangeCompactor(
+            resources.create_data_lake_writer(name),
+            name,
+            parquet_options=queries.PARQUET_OPTIONS,
+            period=config.compaction_period,
+        )
+        try:
+            compactor.compact()
+        except Exception as e:
+            logging.exception(f"Compaction of {name} failed: {e}")
+            failed.append(name)
+
+    # Fail the invocation if any entity failed, after all entities have been compacted.
+    if failed:
+        raise RuntimeError(f"Compaction failed for: {', '.join(failed)}.")
@@ -1,5 +1,8 @@
 from gql import gql
 from shared.utils.data_transformation import flatten_graphql_fields
+from shared.utils.files import ParquetOptions
+from shared.partitioning import SyncTimePartitioning
+from shared.utils.arrow import INT64, DATE, TIMESTAMP, CATEGORY
 
 
 # Name of the queries.
@@ -64,12 +67,41 @@ NODE_FIELDS = """
 """
 
 
-# This is the final list of columns that we want in the pandas dataframe,
+# This is the final list of columns that we want in the Arrow table,
 # and the resulting parquet file.
 # Derived directly from the NODE_FIELDS above to make sure the columns
 # Are deterministic and up-to date.
 COLUMNS = flatten_graphql_fields(NODE_FIELDS)
 
+# The type of each column in the Parquet files. Columns that are not listed are strings.
+# Decimals are exact, and low-cardinality strings are dictionary-encoded (CATEGORY).
+COLUMN_TYPES = {
+    "dbId": INT64,
+    "createdAt": TIMESTAMP,
+    "modifiedAt": TIMESTAMP,
+    "employmentFrom": DATE,
+    "employmentTo": DATE,
+    "positionValue.dbId": INT64,
+    "positionCategory.dbId": INT64,
+    "positionCategory.description": CATEGORY,
+    "compensationType.dbId": INT64,
+    "compensationType.description": CATEGORY,
+    "employmentType.description": CATEGORY,
+    "contact.birthday": DATE,
+    "contact.age": INT64,
+    "contact.country.description": CATEGORY,
+    "contact.gender.name": CATEGORY,
+    "exitReason.dbId": INT64,
+    "glObject1.dbId": INT64,
+}
+
+# The options for writing the Parquet files. zstd at level 3 gives files about 20% smaller
+# than the default snappy at the same encode time (see scripts/benchmark_parquet_options.py).
+PARQUET_OPTIONS = ParquetOptions(compression="zstd", compression_level=3)
+
+# The files are partitioned by the date of the synchronization (year=YYYY/month=MM/day=DD).
+PARTITIONING = SyncTimePartitioning()
+
 
 GET_ITEMS_FROM_DBIDS = gql(f"""
     query get_{ITEMS_QUERY_NAME}($first: Int, $after: String, $dbIdList: [Int!]) {{
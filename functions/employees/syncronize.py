@@ -1,17 +1,16 @@
-from azure import functions as func
-from azure.identity import DefaultAzureCredential
 import logging
 
-from shared.data_lake_writer import DataLakeWriter
-from shared.configuration_manager import SynchronizerStateManager
 from shared.delta_fetcher import DeltaFetcher
 from shared.item_fetcher import ItemFetcher
 from shared.data_syncronizer import DataSynchronizer
-from shared.gql_client import GraphQLClient
-from shared.environment_config import EnvironmentConfig
+from shared.snapshot_merger import SnapshotMerger
+from shared.resources import resources
 
 from functions.employees.queries import (
     COLUMNS,
+    COLUMN_TYPES,
+    PARQUET_OPTIONS,
+    PARTITIONING,
     GET_DELTAS,
     GET_ITEMS_AFTER_CURSOR,
     GET_ITEMS_FROM_DBIDS
@@ -20,24 +19,24 @@ from functions.employees.queries import (
 
 NAME = "employees"
 logging.basicConfig(level=logging.INFO)
-bp = func.Blueprint()
 
-@bp.function_name(f"syncronize_{NAME}")
-@bp.schedule(schedule="0 0 * * * *", arg_name="myTimer", run_on_startup=True,
-              use_monitor=False) 
-def syncronize(myTimer: func.TimerRequest) -> None:
-    # Get credentials.
-    credential = DefaultAzureCredential()
 
-    # Get environment variables.
-    config = EnvironmentConfig()
+def syncronize() -> None:
+    # Get the shared clients, reused across invocations in this worker process.
+    config = resources.config
+    grapql_client = resources.graphql_client
 
     # Initialize classes needed for syncronizing data.
-    grapql_client = GraphQLClient(config.api_endpoint, config.api_key)
-    data_lake_writer = DataLakeWriter(config.data_storage_account, credential, config.data_storage_container, NAME)
+    data_lake_writer = resources.create_data_lake_writer(NAME)
     delta_fetcher = DeltaFetcher(grapql_client, GET_DELTAS)
-    item_fetcher = ItemFetcher(grapql_client, GET_ITEMS_FROM_DBIDS, GET_ITEMS_AFTER_CURSOR)
-    state_manager = SynchronizerStateManager(config.app_config_endpoint, credential, f"{NAME}-")
+    item_fetcher = ItemFetcher(
+        grapql_client,
+        GET_ITEMS_FROM_DBIDS,
+        GET_ITEMS_AFTER_CURSOR,
+        id_chunk_size=config.fetch_id_chunk_size,
+        max_concurrency=config.fetch_max_concurrency,
+    )
+    state_manager = resources.create_state_manager(f"{NAME}-")
 
     # Initialize the data syncronizer.
     syncronizer = DataSynchronizer(
@@ -47,6 +46,14 @@ def syncronize(myTimer: func.TimerRequest) -> None:
         data_lake_writer,
         state_manager,
         delta_fetcher,
+        part_max_rows=config.full_sync_part_max_rows,
+        part_max_bytes=config.full_sync_part_max_bytes,
+        column_types=COLUMN_TYPES,
+        parquet_options=PARQUET_OPTIONS,
+        partitioning=PARTITIONING,
+        snapshot_merger=SnapshotMerger(data_lake_writer, NAME, PARQUET_OPTIONS, shards=config.snapshot_shards) if config.snapshot_enabled else None,
+        pipeline_queue_size=config.sync_pipeline_queue_size,
+        transform_workers=config.transform_workers,
     )
 
     # Syncronize the data.
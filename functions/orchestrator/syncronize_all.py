@@ -0,0 +1,48 @@
+from azure import functions as func
+import logging
+
+from shared.resources import resources
+from shared.sync_orchestrator import SyncOrchestrator
+from functions.timesheets.syncronize import syncronize as syncronize_timesheets
+from functions.customers.syncronize import syncronize as syncronize_customers
+from functions.employees.syncronize import syncronize as syncronize_employees
+from functions.projects.syncronize import syncronize as syncronize_projects
+from functions.suppliers.syncronize import syncronize as syncronize_suppliers
+from functions.ap_transactions.syncronize import syncronize as syncronize_ap_transactions
+from functions.ar_transactions.syncronize import syncronize as syncronize_ar_transactions
+from functions.transactions.syncronize import syncronize as syncronize_transactions
+
+
+NAME = "syncronize_all"
+logging.basicConfig(level=logging.INFO)
+bp = func.Blueprint()
+
+
+# All entities that are syncronized, in default order. Register new entities here.
+SYNC_JOBS = {
+    "timesheets": syncronize_timesheets,
+    "customers": syncronize_customers,
+    "employees": syncronize_employees,
+    "projects": syncronize_projects,
+    "suppliers": syncronize_suppliers,
+    "ap_transactions": syncronize_ap_transactions,
+    "ar_transactions": syncronize_ar_transactions,
+    "transactions": syncronize_transactions,
+}
+
+
+@bp.function_name(NAME)
+@bp.schedule(schedule="0 0 * * * *", arg_name="myTimer", run_on_startup=True,
+              use_monitor=False) 
+def syncronize_all(myTimer: func.TimerRequest) -> None:
+    config = resources.config
+
+    # Syncronize all entities with bounded concurrency.
+    orchestrator = SyncOrchestrator(SYNC_JOBS, config.sync_max_concurrency, config.sync_priority,
+                                    executor=resources.sync_executor)
+    results = orchestrator.run()
+
+    # Fail the invocation if any entity failed, after all entities have been run.
+    failed = [result.name for result in results if not result.succeeded()]
+    if failed:
+        raise RuntimeError(f"Synchronization failed for: {', '.join(failed)}.")
@@ -1,11 +1,9 @@
 from azure import functions as func
-from azure.identity import DefaultAzureCredential
 import logging
 import requests
 import json
 
-from shared.data_lake_writer import DataLakeWriter
-from shared.environment_config import EnvironmentConfig
+from shared.resources import resources
 from shared.utils.time import get_current_time_for_filename
 
 
@@ -19,14 +17,8 @@ bp = func.Blueprint()
 @bp.schedule(schedule="0 0 * * * *", arg_name="myTimer", run_on_startup=False,
               use_monitor=False) 
 def report(myTimer: func.TimerRequest) -> None:
-    # Get credentials.
-    credential = DefaultAzureCredential()
-
-    # Get environment variables.
-    config = EnvironmentConfig()
-
     # Initialize writer.
-    data_lake_writer = DataLakeWriter(config.data_storage_account, credential, config.data_storage_container, NAME)
+    data_lake_writer = resources.create_data_lake_writer(NAME)
 
     # Get the report data and write to storage.
     response = requests.get(URL)
@@ -0,0 +1,81 @@
+"""
+Benchmark the compiled field extractor against flatten_json on synthetic payloads.
+
+Usage (from the repository root):
+    python scripts/benchmark_field_extractor.py [--entity transactions] [--nodes 100000] [--repeat 3]
+"""
+import sys
+import time
+import random
+import argparse
+import importlib
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, ".")
+
+from shared.utils.data_transformation import flatten_json, compile_field_extractor
+
+
+def generate_nodes(columns: List[str], count: int, null_ratio: float = 0.1, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate nested nodes with a value for every column path. Nested objects are null with the given ratio.
+    """
+    rng = random.Random(seed)
+    nodes = []
+    for i in range(count):
+        node = {}
+        for column in columns:
+            *parents, leaf = column.split(".")
+            branch = node
+            for segment in parents:
+                if segment not in branch:
+                    branch[segment] = {} if rng.random() >= null_ratio else None
+                branch = branch[segment]
+                if branch is None:
+                    break
+            else:
+                branch[leaf] = i if leaf == "dbId" else f"{leaf}-{rng.randrange(1000)}"
+        nodes.append(node)
+    return nodes
+
+
+def with_flatten_json(nodes: List[Dict[str, Any]], columns: List[str]) -> Dict[str, List[Any]]:
+    flattened = [flatten_json(node) for node in nodes]
+    return {column: [row.get(column) for row in flattened] for column in columns}
+
+
+def with_extractor(nodes: List[Dict[str, Any]], columns: List[str]) -> Dict[str, List[Any]]:
+    return compile_field_extractor(columns).extract(nodes)
+
+
+def best_time(function: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entity", default="transactions", help="The entity whose columns are extracted.")
+    parser.add_argument("--nodes", type=int, default=100000, help="The number of nodes.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs; the best is reported.")
+    args = parser.parse_args()
+
+    columns = importlib.import_module(f"functions.{args.entity}.queries").COLUMNS
+    nodes = generate_nodes(columns, args.nodes)
+
+    if with_flatten_json(nodes, columns) != with_extractor(nodes, columns):
+        raise SystemExit("The extractors returned different values.")
+
+    print(f"{args.nodes} {args.entity} nodes, {len(columns)} columns, best of {args.repeat}:")
+    baseline = best_time(lambda: with_flatten_json(nodes, columns), args.repeat)
+    print(f"  flatten_json:            {baseline:8.3f}s")
+    compiled = best_time(lambda: with_extractor(nodes, columns), args.repeat)
+    print(f"  compiled extractor:      {compiled:8.3f}s ({baseline / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
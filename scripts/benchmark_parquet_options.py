@@ -0,0 +1,96 @@
+"""
+Benchmark Parquet writer options on synthetic payloads, reporting the bytes written and the encode time.
+
+Usage (from the repository root):
+    python scripts/benchmark_parquet_options.py [--entity transactions] [--nodes 100000] [--repeat 3]
+"""
+import sys
+import time
+import random
+import argparse
+import importlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+sys.path.insert(0, ".")
+
+import pyarrow as pa
+from shared.utils.arrow import build_arrow_schema, convert_nodes_to_arrow_table
+from shared.utils.files import ParquetOptions, convert_arrow_table_to_parquet
+
+
+def generate_value(arrow_type: pa.DataType, leaf: str, rng: random.Random) -> Any:
+    """
+    Generate a value of the kind the GraphQL API returns for a column type.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return f"{leaf}-{rng.randrange(8)}"
+    if pa.types.is_integer(arrow_type):
+        return rng.randrange(1, 10 ** 9)
+    if pa.types.is_decimal(arrow_type):
+        return round(rng.uniform(-100000, 100000), 2)
+    if pa.types.is_boolean(arrow_type):
+        return rng.random() < 0.5
+    if pa.types.is_date(arrow_type):
+        return (date(2020, 1, 1) + timedelta(days=rng.randrange(1500))).isoformat()
+    if pa.types.is_timestamp(arrow_type):
+        return (datetime(2020, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randrange(10 ** 8))).isoformat()
+    return f"{leaf} {rng.randrange(20000)}"
+
+
+def generate_nodes(schema: pa.Schema, count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate nested nodes with a value of the declared type for every column path.
+    """
+    rng = random.Random(seed)
+    nodes = []
+    for _ in range(count):
+        node = {}
+        for field in schema:
+            *parents, leaf = field.name.split(".")
+            branch = node
+            for segment in parents:
+                branch = branch.setdefault(segment, {})
+            branch[leaf] = generate_value(field.type, leaf, rng)
+        nodes.append(node)
+    return nodes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entity", default="transactions", help="The entity whose columns and types are used.")
+    parser.add_argument("--nodes", type=int, default=100000, help="The number of rows.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs; the best encode time is reported.")
+    args = parser.parse_args()
+
+    queries = importlib.import_module(f"functions.{args.entity}.queries")
+    schema = build_arrow_schema(queries.COLUMNS, queries.COLUMN_TYPES)
+    table = convert_nodes_to_arrow_table(generate_nodes(schema, args.nodes), queries.COLUMNS, schema=schema)
+    categories = [field.name for field in schema if pa.types.is_dictionary(field.type)]
+
+    settings = {
+        "snappy (pyarrow default)": ParquetOptions(),
+        "snappy, dictionary on categories": ParquetOptions(dictionary_columns=categories),
+        "zstd level 1": ParquetOptions(compression="zstd", compression_level=1),
+        "zstd level 3": ParquetOptions(compression="zstd", compression_level=3),
+        "zstd level 9": ParquetOptions(compression="zstd", compression_level=9),
+        "zstd level 3, dictionary on categories": ParquetOptions(compression="zstd", compression_level=3, dictionary_columns=categories),
+        "zstd level 3, row groups of 10000": ParquetOptions(compression="zstd", compression_level=3, row_group_size=10000),
+        "zstd level 3, statistics on dbId": ParquetOptions(compression="zstd", compression_level=3, statistics_columns=["dbId"]),
+        "gzip": ParquetOptions(compression="gzip"),
+        "uncompressed": ParquetOptions(compression="none"),
+    }
+
+    print(f"{args.nodes} {args.entity} rows, {len(schema)} columns, best of {args.repeat}:")
+    print(f"  {'setting':<42} {'bytes':>12} {'encode':>9}")
+    for name, options in settings.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            size = convert_arrow_table_to_parquet(table, options).getbuffer().nbytes
+            timings.append(time.perf_counter() - start)
+        print(f"  {name:<42} {size:>12} {min(timings):>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark converting pages of synthetic nodes to Arrow tables on one thread against a pool of worker processes.
+
+The conversion only scales with the number of workers up to the number of cores; with one core the pool is
+slower than converting on a thread, because the nodes are pickled to the workers.
+
+Usage (from the repository root):
+    python scripts/benchmark_transform_workers.py [--entity transactions] [--pages 10] [--page-size 10000] [--workers 1 2 4]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import importlib
+from typing import Any, Dict, List
+import pyarrow as pa
+
+sys.path.insert(0, ".")
+
+from shared.item_fetcher import ItemsResult
+from shared.transform_pool import TransformPool
+from shared.utils.arrow import build_arrow_schema, convert_nodes_to_arrow_table
+
+
+def generate_value(arrow_type: pa.DataType, index: int, rng: random.Random) -> Any:
+    """
+    Generate a value of a column type as the GraphQL API returns it.
+    """
+    if pa.types.is_decimal(arrow_type):
+        return f"{rng.randrange(-10 ** 8, 10 ** 8) / 100:.2f}"
+    if pa.types.is_timestamp(arrow_type):
+        return f"2024-07-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00+00:00"
+    if pa.types.is_date(arrow_type):
+        return f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+    if pa.types.is_integer(arrow_type):
+        return str(index)
+    if pa.types.is_boolean(arrow_type):
+        return rng.random() < 0.5
+    return f"value-{rng.randrange(1000)}"
+
+
+def generate_nodes(schema: pa.Schema, count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate nested nodes with a value of the right type for every column path of a schema.
+    """
+    rng = random.Random(seed)
+    nodes = []
+    for i in range(count):
+        node = {}
+        for field in schema:
+            *parents, leaf = field.name.split(".")
+            branch = node
+            for segment in parents:
+                branch = branch.setdefault(segment, {})
+            branch[leaf] = generate_value(field.type, i, rng)
+        nodes.append(node)
+    return nodes
+
+
+def with_thread(pages: List[ItemsResult], columns: List[str], schema) -> int:
+    rows = 0
+    for page in pages:
+        rows += convert_nodes_to_arrow_table(page.get_items(), columns, {"mutationType": "ADDED"}, schema).num_rows
+    return rows
+
+
+def with_pool(pages: List[ItemsResult], columns: List[str], schema, workers: int) -> (int, float):
+    rows = 0
+    with TransformPool(workers, columns, {"mutationType": "ADDED"}, schema) as pool:
+        # Start the workers before timing, since a pool is started once per full synchronization.
+        for future in [pool.convert(pages[0].get_items()[:1]) for _ in range(workers)]:
+            future.result()
+
+        start = time.perf_counter()
+        for table, _ in pool.map_pages(pages):
+            rows += table.num_rows
+        elapsed = time.perf_counter() - start
+    return rows, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entity", default="transactions", help="The entity whose columns are converted.")
+    parser.add_argument("--pages", type=int, default=10, help="The number of pages.")
+    parser.add_argument("--page-size", type=int, default=10000, help="The number of nodes per page.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="The pool sizes to run.")
+    args = parser.parse_args()
+
+    queries = importlib.import_module(f"functions.{args.entity}.queries")
+    columns = list(queries.COLUMNS) + ["mutationType"]
+    column_types = {column: arrow_type for column, arrow_type in queries.COLUMN_TYPES.items() if column in columns}
+    schema = build_arrow_schema(columns, column_types)
+    nodes = generate_nodes(build_arrow_schema(queries.COLUMNS, column_types), args.page_size)
+    pages = [ItemsResult(nodes, str(page)) for page in range(args.pages)]
+    total = args.pages * args.page_size
+
+    print(f"{args.pages} pages of {args.page_size} {args.entity} nodes, {len(columns)} columns, {os.cpu_count()} cores:")
+    start = time.perf_counter()
+    with_thread(pages, columns, schema)
+    baseline = time.perf_counter() - start
+    print(f"  thread:        {baseline:8.3f}s ({total / baseline:10.0f} rows/s)")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        rows, elapsed = with_pool(pages, columns, schema, workers)
+        if rows != total:
+            raise SystemExit("The pool returned a different number of rows.")
+        startup = time.perf_counter() - start - elapsed
+        print(f"  {workers:2d} workers:    {elapsed:8.3f}s ({total / elapsed:10.0f} rows/s, {baseline / elapsed:.2f}x), "
+              f"{startup:.1f}s to start the pool")
+
+
+if __name__ == "__main__":
+    main()
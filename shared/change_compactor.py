@@ -0,0 +1,213 @@
+import io
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from shared.data_lake_writer import DataLakeWriter
+from shared.utils.files import ParquetOptions, convert_arrow_table_to_parquet
+from shared.utils.time import generate_iso_8601_timestamp, parse_time_from_filename
+
+
+# Directory for compacted files that are not yet in place and the records of their compactions.
+COMPACTIONS_DIRECTORY = "_compactions"
+
+
+class ChangeCompactor:
+    """
+    Merges the small sync_changes files of an entity into one file per partition and period.
+
+    Every change synchronization writes a new file, so an entity synchronized hourly gets thousands of
+    small files a year. The compactor merges the files of each completed period (day or month) within a
+    partition directory into one file named sync_changes-<first timestamp>-<last timestamp>-<name>.parquet.
+    The rows are kept in the order of the original files and, within a file, in their original order, so
+    the order of the mutations is preserved.
+
+    A compaction replaces its files as follows:
+    1. The compacted file is written to the _compactions directory, where readers ignore it.
+    2. A compaction manifest listing the compacted file and the files it replaces is written.
+    3. The original files are moved into the _compactions directory, each with a single rename.
+    4. The compacted file is moved into place with a single rename.
+    5. The moved original files are deleted and the manifest is marked complete.
+    The original files are out of sight of readers before the compacted file appears, so readers never see
+    the rows of a compaction twice; a reader listing the partition between steps 3 and 4 misses them instead.
+    A compaction that is interrupted is completed from its manifest on the next run, before new
+    compactions are started.
+
+    Attributes:
+    data_lake_writer (DataLakeWriter): The instance used to read and write the files of the entity.
+    name (str): The name of the entity.
+    parquet_options (Optional[ParquetOptions]): The options for writing the compacted files.
+    period (str): The period of the files merged into one file: "day" or "month".
+    """
+
+    def __init__(self,
+                 data_lake_writer: DataLakeWriter,
+                 name: str,
+                 parquet_options: Optional[ParquetOptions] = None,
+                 period: str = "month") -> None:
+        """
+        Initialize a new instance of ChangeCompactor.
+
+        Args:
+        data_lake_writer (DataLakeWriter): The instance used to read and write the files of the entity.
+        name (str): The name of the entity.
+        parquet_options (Optional[ParquetOptions]): The options for writing the compacted files.
+        period (str): The period of the files merged into one file: "day" or "month". Defaults to month.
+        """
+        if period not in ("day", "month"):
+            raise ValueError(f"Unsupported compaction period: {period}.")
+        self.data_lake_writer = data_lake_writer
+        self.name = name
+        self.parquet_options = parquet_options
+        self.period = period
+
+    def compact(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Complete any interrupted compactions and compact the change files of all completed periods.
+
+        Args:
+        now (Optional[datetime]): The current time. Only periods that ended before it are compacted. Defaults to now.
+
+        Returns:
+        List[str]: The paths of the compacted files written, relative to the directory of the entity.
+        """
+        now = now or datetime.now()
+        self._complete_interrupted_compactions()
+
+        compacted = []
+        for (partition, period_start), files in sorted(self._group_change_files().items()):
+            if len(files) < 2 or self._period_end(period_start) > now:
+                continue
+            try:
+                compacted.append(self._compact_files(partition, files))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                # Files written with different schemas, e.g. before the column types were declared, are left as they are.
+                logging.warning(f"Skipping compaction of {len(files)} change files of {self.name} in '{partition}': {e}")
+
+        logging.info(f"Compacted {len(compacted)} groups of change files for {self.name}.")
+        return compacted
+
+    def _group_change_files(self) -> Dict[Tuple[str, datetime], List[str]]:
+        """
+        Group the change files of the entity by partition directory and period.
+
+        Returns:
+        Dict[Tuple[str, datetime], List[str]]: The files of each partition and period start, in mutation order.
+        """
+        groups = {}
+        for path in self.data_lake_writer.list_files():
+            partition, _, file_name = path.rpartition("/")
+            if not (file_name.startswith("sync_changes-") and file_name.endswith(".parquet")):
+                continue
+            sync_time = parse_time_from_filename(file_name)
+            groups.setdefault((partition, self._period_start(sync_time)), []).append((sync_time, path))
+        return {key: [path for _, path in sorted(files)] for key, files in groups.items()}
+
+    def _period_start(self, sync_time: datetime) -> datetime:
+        """
+        Get the start of the period of a synchronization time.
+
+        Args:
+        sync_time (datetime): The synchronization time.
+
+        Returns:
+        datetime: The start of the day or month.
+        """
+        start = sync_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        return start.replace(day=1) if self.period == "month" else start
+
+    def _period_end(self, period_start: datetime) -> datetime:
+        """
+        Get the end of a period.
+
+        Args:
+        period_start (datetime): The start of the period.
+
+        Returns:
+        datetime: The start of the next period.
+        """
+        if self.period == "day":
+            return period_start + timedelta(days=1)
+        if period_start.month == 12:
+            return period_start.replace(year=period_start.year + 1, month=1)
+        return period_start.replace(month=period_start.month + 1)
+
+    def _compact_files(self, partition: str, files: List[str]) -> str:
+        """
+        Merge change files into one file and replace the originals with it.
+
+        Args:
+        partition (str): The partition directory of the files, relative to the directory of the entity.
+        files (List[str]): The paths of the files, in mutation order.
+
+        Returns:
+        str: The path of the compacted file.
+        """
+        # Read the files in mutation order and merge them.
+        tables = [pq.read_table(io.BytesIO(self.data_lake_writer.read_data(path))) for path in files]
+        table = pa.concat_tables(tables, promote_options="default")
+
+        first = parse_time_from_filename(files[0].rpartition("/")[2]).strftime('%Y%m%d_%H_%M_%S')
+        last = parse_time_from_filename(files[-1].rpartition("/")[2]).strftime('%Y%m%d_%H_%M_%S')
+        file_name = f"sync_changes-{first}-{last}-{self.name}.parquet"
+        target = f"{partition}/{file_name}" if partition else file_name
+        staged = f"{COMPACTIONS_DIRECTORY}/{target}"
+
+        # Stage the compacted file and record the compaction before replacing anything.
+        self.data_lake_writer.write_data(staged, convert_arrow_table_to_parquet(table, self.parquet_options))
+        manifest = {
+            "name": self.name,
+            "created": generate_iso_8601_timestamp(),
+            "complete": False,
+            "staged": staged,
+            "target": target,
+            "sources": files,
+            "retired": [f"{COMPACTIONS_DIRECTORY}/{target}.sources/{path}" for path in files],
+            "rows": table.num_rows,
+        }
+        manifest_name = f"{COMPACTIONS_DIRECTORY}/{target}.manifest.json"
+        self.data_lake_writer.write_data(manifest_name, json.dumps(manifest, indent=2))
+
+        self._replace_files(manifest_name, manifest)
+        logging.info(f"Compacted {len(files)} change files of {self.name} into {target} ({table.num_rows} rows).")
+        return target
+
+    def _replace_files(self, manifest_name: str, manifest: Dict) -> None:
+        """
+        Move the files a compaction replaces out of sight of readers, move the staged compacted file into place,
+        delete the replaced files and mark the compaction complete. Every step can be repeated, so an interrupted
+        compaction is completed by calling this again.
+
+        Args:
+        manifest_name (str): The path of the compaction manifest.
+        manifest (Dict): The compaction manifest.
+        """
+        # The staged file is only gone once it has been moved into place, after all sources were moved away.
+        if self.data_lake_writer.file_exists(manifest["staged"]):
+            for source, retired in zip(manifest["sources"], manifest["retired"]):
+                if self.data_lake_writer.file_exists(source):
+                    self.data_lake_writer.move_file(source, retired)
+            self.data_lake_writer.move_file(manifest["staged"], manifest["target"])
+
+        for retired in manifest["retired"]:
+            self.data_lake_writer.delete_file(retired)
+
+        manifest["complete"] = True
+        manifest["completed"] = generate_iso_8601_timestamp()
+        self.data_lake_writer.write_data(manifest_name, json.dumps(manifest, indent=2))
+
+    def _complete_interrupted_compactions(self) -> None:
+        """
+        Complete the compactions whose manifest is not marked complete.
+        """
+        directory = f"{self.data_lake_writer.default_directory}/{COMPACTIONS_DIRECTORY}"
+        for path in self.data_lake_writer.list_files(directory_name=directory):
+            if not path.endswith(".manifest.json"):
+                continue
+            manifest_name = f"{COMPACTIONS_DIRECTORY}/{path}"
+            manifest = json.loads(self.data_lake_writer.read_data(manifest_name))
+            if not manifest["complete"]:
+                logging.info(f"Completing interrupted compaction of {self.name} into {manifest['target']}.")
+                self._replace_files(manifest_name, manifest)
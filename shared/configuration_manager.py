@@ -1,8 +1,9 @@
 import logging
 from azure.appconfiguration import AzureAppConfigurationClient
 from azure.appconfiguration import ConfigurationSetting
-from azure.core.exceptions import ResourceNotFoundError, AzureError
+from azure.core.exceptions import AzureError
 from azure.identity import DefaultAzureCredential
+from shared.state_store import StateStore, StateConflictError, AppConfigurationStateStore
 
 
 class ConfigurationManager:
@@ -43,59 +44,115 @@ class ConfigurationManager:
 
 class SynchronizerStateManager:
     """
-    Manages the synchronizer state using Azure App Configuration.
+    Manages the synchronizer state in a StateStore, by default Azure App Configuration.
 
     This class handles state variables related to the synchronization process,
-    including `deltas_cursor`, `initial_sync_complete`, and `initial_sync_cursor`.
-    The state is stored and retrieved directly from Azure App Configuration.
+    including `deltas_cursor`, `initial_sync_complete`, `initial_sync_cursor` and `initial_sync_run`.
+
+    All state for the prefix is loaded with a single request on first access and read from memory
+    afterwards. Changes are staged in memory and written by `commit`, using the ETags from the load for
+    optimistic concurrency, so a run that raced with another run fails instead of overwriting its state.
     """
 
-    def __init__(self, app_config_endpoint: str, credential: DefaultAzureCredential, prefix: str = ''):
+    def __init__(self,
+                 app_config_endpoint: str = None,
+                 credential: DefaultAzureCredential = None,
+                 prefix: str = '',
+                 client: AzureAppConfigurationClient = None,
+                 store: StateStore = None):
         """
         Initialize the SynchronizerStateManager.
 
         :param app_config_endpoint: Endpoint URL for Azure App Configuration.
         :param credential: Credential for Azure authentication.
         :param prefix: Optional prefix for filtering configuration keys.
+        :param client: An existing App Configuration client to reuse, created if not specified.
+        :param store: The store to keep the state in. Defaults to Azure App Configuration.
         """
-        self._client = AzureAppConfigurationClient(app_config_endpoint, credential)
+        if store is None:
+            store = AppConfigurationStateStore(client or AzureAppConfigurationClient(app_config_endpoint, credential))
+        self._store = store
         self._prefix = prefix
+        self._entries = None
+        self._pending = {}
+
+    def _load(self) -> None:
+        """
+        Load all state for the prefix from the store, unless it has already been loaded.
+        """
+        if self._entries is not None:
+            return
+
+        try:
+            entries = self._store.load(self._prefix)
+            self._entries = {key[len(self._prefix):]: entry for key, entry in entries.items()}
+            logging.info(f"Loaded {len(self._entries)} state keys for prefix '{self._prefix}'.")
+        except AzureError as e:
+            logging.error(f"Error loading state for prefix '{self._prefix}': {e}")
+            raise
 
     def _get_state(self, key: str):
         """
-        Fetch the current value for the specified key from Azure App Configuration.
+        Get the current value for the specified key, including changes that have not been committed.
 
         :param key: The key of the configuration setting.
         :return: The value of the configuration setting, or None if the key does not exist.
         """
-        try:
-            config_key = f"{self._prefix}{key}"
-            setting = self._client.get_configuration_setting(key=config_key)
-            logging.info(f"Fetched state: {key} = {setting.value}")
-            return setting.value
-        except ResourceNotFoundError:
+        if key in self._pending:
+            return self._pending[key]
+
+        self._load()
+        entry = self._entries.get(key)
+        if entry is None:
             logging.warning(f"State key not found: {key}")
             return None
-        except AzureError as e:
-            logging.error(f"Error fetching state {key}: {e}")
-            raise
+
+        logging.info(f"Fetched state: {key} = {entry.value}")
+        return entry.value
 
     def _save_state(self, key: str, value: str):
         """
-        Save the value for the specified key to Azure App Configuration.
+        Stage the value for the specified key. The value is written to the store by `commit`.
 
         :param key: The key of the configuration setting.
         :param value: The value to be saved.
         """
+        self._pending[key] = value
+        logging.info(f"Staged state: {key} = {value}")
+
+    def commit(self) -> None:
+        """
+        Write all staged changes to the store.
+
+        Existing keys are only overwritten if they have not been modified since they were loaded,
+        and new keys are only added if they do not exist yet.
+
+        :raises StateConflictError: If the state was modified by someone else since it was loaded.
+        """
+        if not self._pending:
+            return
+
+        self._load()
+        changes = {}
+        for key, value in self._pending.items():
+            entry = self._entries.get(key)
+            changes[f"{self._prefix}{key}"] = (value, entry.etag if entry else None)
+
         try:
-            config_key = f"{self._prefix}{key}"
-            config_setting = ConfigurationSetting(key=config_key, value=value)
-            self._client.set_configuration_setting(config_setting)
-            logging.info(f"Saved state: {key} = {value}")
+            saved = self._store.save(changes, self._prefix)
+        except StateConflictError as e:
+            logging.error(f"State for prefix '{self._prefix}' was modified by another run: {e}")
+            raise
         except AzureError as e:
-            logging.error(f"Error saving state {key}: {e}")
+            logging.error(f"Error saving state for prefix '{self._prefix}': {e}")
             raise
 
+        for config_key, entry in saved.items():
+            key = config_key[len(self._prefix):]
+            self._entries[key] = entry
+            logging.info(f"Saved state: {key} = {entry.value}")
+        self._pending = {}
+
     @property
     def deltas_cursor(self) -> str:
         """
@@ -150,8 +207,25 @@ class SynchronizerStateManager:
         """
         self._save_state('initial_sync_cursor', cursor)
 
+    @property
+    def initial_sync_run(self) -> str:
+        """
+        Get the name of the initial synchronization run that is in progress.
+
+        :return: The name of the run in progress, or None if no run is in progress.
+        """
+        return self._get_state('initial_sync_run')
+
+    @initial_sync_run.setter
+    def initial_sync_run(self, run: str):
+        """
+        Set the name of the initial synchronization run that is in progress.
+
+        :param run: The name of the run, or an empty string when no run is in progress.
+        """
+        self._save_state('initial_sync_run', run)
+
     def reset_state(self):
-        settings = self._client.list_configuration_settings()
-        for setting in settings:
-            self._client.delete_configuration_setting(setting.key)
-            logging.info(f"Deleted state: {setting.key}.")
\ No newline at end of file
+        self._store.delete_all(self._prefix)
+        self._entries = None
+        self._pending = {}
\ No newline at end of file
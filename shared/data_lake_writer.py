@@ -1,19 +1,61 @@
+import json
+import uuid
 import logging
+import threading
 from io import BytesIO
+from typing import Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from azure.storage.filedatalake import DataLakeServiceClient, DataLakeFileClient
-from azure.core.exceptions import ResourceExistsError, HttpResponseError
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError, HttpResponseError
 from azure.identity import DefaultAzureCredential
 
 
+# File systems and directories known to exist, shared by all writers in the process.
+_shared_existing_paths = set()
+_existing_paths_lock = threading.Lock()
+
+# Directories, relative to the target directory, for files that are not committed data. Names starting
+# with an underscore are ignored by Spark, Synapse and other Hive-style readers.
+TEMP_DIRECTORY = "_tmp"
+COMMITS_DIRECTORY = "_commits"
+
+
 class DataLakeWriter:
     """
     Handles writing data to Azure Data Lake Storage.
 
     This class manages the creation of file systems, directories, and files,
-    and supports writing string data or data from a BytesIO object directly to Azure Data Lake Storage.
+    and supports streaming string, bytes, file-like or chunked data directly to Azure Data Lake Storage.
+
+    File systems and directories that are known to exist are cached, so after the first write to a
+    directory each subsequent write only creates, appends and flushes the file. The cache is shared
+    by all writers in the process unless disabled, and is invalidated for a file system when a write
+    finds that a cached path no longer exists.
+
+    Writes are atomic: the data is written to a uniquely named file in a temporary directory and
+    then renamed to its target path, so readers never see a partially written file, and a failed or
+    retried write never leaves a truncated or mixed file behind. An existing file at the target path
+    is replaced as a whole.
+
+    Writes can be made idempotent with reserve_file_name, which records the file name for an
+    idempotency key (e.g. derived from the cursor range of the data) before the data is written,
+    and mark_committed, which records that all files for the key have been written. A retry with
+    the same key reuses the reserved name and can skip the write once it has been committed.
+
+    File names may be paths relative to the directory, e.g. year=2024/month=07/data.parquet, for
+    partitioned layouts.
     """
 
-    def __init__(self, account_name: str, credential: DefaultAzureCredential, default_file_system: str = None, default_directory: str = None):
+    def __init__(self,
+                 account_name: str,
+                 credential: DefaultAzureCredential,
+                 default_file_system: str = None,
+                 default_directory: str = None,
+                 service_client: DataLakeServiceClient = None,
+                 share_existence_cache: bool = True,
+                 upload_chunk_size: int = 4 * 1024 * 1024,
+                 upload_max_concurrency: int = 1):
         """
         Initialize the DataLakeWriter with the storage account credentials and default file system/directory.
 
@@ -21,13 +63,20 @@ class DataLakeWriter:
         :param credential: Azure credential for authentication
         :param default_file_system: Default file system (container) name
         :param default_directory: Default directory name
+        :param service_client: An existing service client for the account to reuse, created if not specified
+        :param share_existence_cache: Share the cache of existing file systems and directories with all writers in the process
+        :param upload_chunk_size: Size in bytes of the blocks appended to a file
+        :param upload_max_concurrency: Number of blocks uploaded in parallel
         """
-        self.service_client = DataLakeServiceClient(
+        self.service_client = service_client or DataLakeServiceClient(
             account_url=f"https://{account_name}.dfs.core.windows.net",
             credential=credential
         )
         self.default_file_system = default_file_system
         self.default_directory = default_directory
+        self._existing_paths = _shared_existing_paths if share_existence_cache else set()
+        self.upload_chunk_size = upload_chunk_size
+        self.upload_max_concurrency = upload_max_concurrency
 
     def _get_file_system_client(self, file_system_name: str):
         """
@@ -44,6 +93,9 @@ class DataLakeWriter:
 
         :param file_system_name: Name of the file system (container)
         """
+        if self._path_exists(file_system_name):
+            return
+
         file_system_client = self._get_file_system_client(file_system_name)
         try:
             file_system_client.create_file_system()
@@ -53,6 +105,7 @@ class DataLakeWriter:
         except HttpResponseError as e:
             logging.error(f"Failed to create or access file system '{file_system_name}': {e}")
             raise
+        self._mark_path_exists(file_system_name)
 
     def _ensure_directory_exists(self, file_system_client, directory_name: str) -> None:
         """
@@ -61,11 +114,17 @@ class DataLakeWriter:
         :param file_system_client: Client for the file system
         :param directory_name: Name of the directory
         """
+        file_system_name = file_system_client.file_system_name
+        if self._path_exists(file_system_name, directory_name.strip('/')):
+            return
+
         try:
             parent_directories = directory_name.strip('/').split('/')
             current_path = ''
             for dir_name in parent_directories:
                 current_path = f"{current_path}/{dir_name}" if current_path else dir_name
+                if self._path_exists(file_system_name, current_path):
+                    continue
                 try:
                     file_system_client.create_directory(current_path)
                     logging.info(f"Directory '{current_path}' created.")
@@ -75,13 +134,72 @@ class DataLakeWriter:
                     else:
                         logging.error(f"Failed to create directory '{current_path}': {e}")
                         raise
+                self._mark_path_exists(file_system_name, current_path)
         except HttpResponseError as e:
             logging.error(f"Failed to ensure directory '{directory_name}' exists: {e}")
             raise
 
+    def _path_exists(self, file_system_name: str, directory_name: str = None) -> bool:
+        """
+        Check whether a file system or directory is known to exist.
+
+        :param file_system_name: Name of the file system (container)
+        :param directory_name: Name of the directory, or None for the file system itself
+        :return: True if the path is in the existence cache
+        """
+        return (self.service_client.url, file_system_name, directory_name) in self._existing_paths
+
+    def _mark_path_exists(self, file_system_name: str, directory_name: str = None) -> None:
+        """
+        Add a file system or directory to the existence cache.
+
+        :param file_system_name: Name of the file system (container)
+        :param directory_name: Name of the directory, or None for the file system itself
+        """
+        with _existing_paths_lock:
+            self._existing_paths.add((self.service_client.url, file_system_name, directory_name))
+
+    def _invalidate_existence_cache(self, file_system_name: str) -> None:
+        """
+        Remove a file system and all its directories from the existence cache.
+
+        :param file_system_name: Name of the file system (container)
+        """
+        with _existing_paths_lock:
+            stale = [path for path in self._existing_paths
+                     if path[0] == self.service_client.url and path[1] == file_system_name]
+            self._existing_paths.difference_update(stale)
+
+    def _prepare_file_client(self, file_system_name: str, directory_name: str, file_name: str) -> DataLakeFileClient:
+        """
+        Ensure the file system and directory exist and get or create the file client.
+
+        If the file cannot be created because a cached file system or directory no longer exists,
+        the cache is invalidated and the paths are created again.
+
+        :param file_system_name: Name of the file system (container)
+        :param directory_name: Name of the directory
+        :param file_name: Name of the file
+        :return: File client
+        """
+        file_system_client = self._get_file_system_client(file_system_name)
+        for attempt in range(2):
+            self._ensure_file_system_exists(file_system_name)
+            self._ensure_directory_exists(file_system_client, directory_name)
+            try:
+                return self._get_file_client(file_system_client, directory_name, file_name)
+            except ResourceNotFoundError:
+                if attempt > 0:
+                    raise
+                logging.info(f"Cached path '{file_system_name}/{directory_name}' no longer exists. Recreating it.")
+                self._invalidate_existence_cache(file_system_name)
+
     def _get_file_client(self, file_system_client, directory_name: str, file_name: str) -> DataLakeFileClient:
         """
-        Get or create the file client.
+        Create the file and get its client.
+
+        An existing file is never reused, since appending at offset 0 to a file that already
+        holds data could leave a mix of old and new data behind.
 
         :param file_system_client: Client for the file system
         :param directory_name: Name of the directory
@@ -92,36 +210,82 @@ class DataLakeWriter:
         try:
             return directory_client.create_file(file_name)
         except HttpResponseError as e:
-            if e.status_code == 409:  # File already exists
-                logging.info(f"File '{file_name}' already exists in '{directory_name}'.")
-                return directory_client.get_file_client(file_name)
-            else:
-                logging.error(f"Failed to create or get file '{file_name}': {e}")
-                raise
+            logging.error(f"Failed to create file '{file_name}': {e}")
+            raise
+
+    def _iter_chunks(self, data) -> Iterator[bytes]:
+        """
+        Split data into chunks of at most upload_chunk_size bytes, without reading it all into memory.
 
-    def _write_to_file(self, file_client: DataLakeFileClient, data: bytes) -> None:
+        :param data: A string, bytes, a binary file-like object (such as BytesIO) or an iterable of byte chunks
+        :return: An iterator of byte chunks
+        :raises ValueError: If the data is of an unsupported type
         """
-        Write data to the file.
+        chunk_size = self.upload_chunk_size
+
+        if isinstance(data, str):
+            data = data.encode('utf-8')  # Convert string data to bytes
+
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            view = memoryview(data)
+            return (bytes(view[i:i + chunk_size]) for i in range(0, len(view), chunk_size))
+
+        if hasattr(data, 'read'):
+            if isinstance(data, BytesIO):
+                data.seek(0)  # Move to the start of the BytesIO buffer
+            return iter(lambda: data.read(chunk_size), b'')
+
+        if hasattr(data, '__iter__') and not isinstance(data, dict):
+            return (bytes(chunk) for chunk in data if chunk)
+
+        raise ValueError("Data must be a string, bytes, a file-like object or an iterable of byte chunks.")
+
+    def _write_to_file(self, file_client: DataLakeFileClient, chunks: Iterable[bytes]) -> int:
+        """
+        Write data to the file as a sequence of appended blocks, followed by a single flush.
+
+        Blocks are appended at their offset in the file, so with upload_max_concurrency above one
+        several blocks are uploaded in parallel. At most upload_max_concurrency blocks are held in
+        memory at a time.
 
         :param file_client: Client for the file
-        :param data: Data to write to the file
+        :param chunks: The data to write to the file, as byte chunks
+        :return: The number of bytes written
         """
+        offset = 0
         try:
-            file_client.append_data(data, offset=0, length=len(data))
-            file_client.flush_data(len(data))
+            if self.upload_max_concurrency <= 1:
+                for chunk in chunks:
+                    file_client.append_data(chunk, offset=offset, length=len(chunk))
+                    offset += len(chunk)
+            else:
+                with ThreadPoolExecutor(max_workers=self.upload_max_concurrency) as executor:
+                    in_flight = set()
+                    for chunk in chunks:
+                        if len(in_flight) >= self.upload_max_concurrency:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                future.result()
+                        in_flight.add(executor.submit(file_client.append_data, chunk, offset=offset, length=len(chunk)))
+                        offset += len(chunk)
+                    for future in in_flight:
+                        future.result()
+
+            file_client.flush_data(offset)
             logging.info("Data written successfully.")
+            return offset
         except HttpResponseError as e:
             logging.error(f"Failed to write data to file '{file_client.path_name}': {e}")
             raise
 
-    def write_data(self, file_name: str, data, file_system_name: str = None, directory_name: str = None) -> None:
+    def _resolve_location(self, file_system_name: str = None, directory_name: str = None) -> Tuple[str, str]:
         """
-        Write data to a file in Azure Data Lake Storage.
+        Apply the default file system and directory.
 
-        :param file_name: Name of the file
-        :param data: Data to write to the file, can be a string or BytesIO object
         :param file_system_name: Name of the file system (container), uses default if not specified
         :param directory_name: Name of the directory, uses default if not specified
+        :return: The file system and directory names
+        :raises ValueError: If no file system or directory is specified or set as default
         """
         file_system_name = file_system_name or self.default_file_system
         directory_name = directory_name or self.default_directory
@@ -129,31 +293,279 @@ class DataLakeWriter:
         if not file_system_name or not directory_name:
             raise ValueError("File system and directory must be specified either as parameters or defaults.")
 
-        # Ensure the file system exists.
-        self._ensure_file_system_exists(file_system_name)
+        return file_system_name, directory_name
 
-        # Get the file system client.
+    def _split_file_path(self, directory_name: str, file_name: str) -> Tuple[str, str]:
+        """
+        Move the directories of a file path relative to a directory into the directory name.
+
+        :param directory_name: Name of the directory
+        :param file_name: Name or relative path of the file
+        :return: The directory name including any subdirectories of the file path, and the file name
+        """
+        if "/" not in file_name:
+            return directory_name, file_name
+        subdirectory, file_name = file_name.rsplit("/", 1)
+        return f"{directory_name}/{subdirectory}", file_name
+
+    def _commit_file(self,
+                     file_client: DataLakeFileClient,
+                     file_system_name: str,
+                     directory_name: str,
+                     file_name: str,
+                     overwrite: bool = True) -> None:
+        """
+        Rename a fully written temporary file to its target path.
+        The temporary file is deleted if the rename fails.
+
+        :param file_client: Client for the temporary file
+        :param file_system_name: Name of the file system (container)
+        :param directory_name: Name of the target directory
+        :param file_name: Name of the target file
+        :param overwrite: Whether to replace an existing file. If False, the rename only succeeds if the target does not exist
+        :raises ResourceExistsError: If overwrite is False and the target exists
+        """
+        conditions = {} if overwrite else {"match_condition": MatchConditions.IfMissing}
+        try:
+            file_client.rename_file(f"{file_system_name}/{directory_name}/{file_name}", **conditions)
+        except ResourceExistsError:
+            self._delete_temporary_file(file_client)
+            raise
+        except HttpResponseError as e:
+            logging.error(f"Failed to commit file '{file_system_name}/{directory_name}/{file_name}': {e}")
+            self._delete_temporary_file(file_client)
+            raise
+
+    def _delete_temporary_file(self, file_client: DataLakeFileClient) -> None:
+        """
+        Delete a temporary file, logging instead of raising on failure.
+
+        :param file_client: Client for the temporary file
+        """
+        try:
+            file_client.delete_file()
+        except HttpResponseError as e:
+            logging.warning(f"Failed to delete temporary file '{file_client.path_name}': {e}")
+
+    def write_data(self, file_name: str, data, file_system_name: str = None, directory_name: str = None, overwrite: bool = True) -> None:
+        """
+        Write data to a file in Azure Data Lake Storage.
+
+        The data is streamed to the file in blocks of upload_chunk_size bytes, so file-like objects and
+        iterables of byte chunks are never read into memory as a whole. It is written to a temporary file
+        first, which is renamed to the target path once all data has been flushed.
+
+        :param file_name: Name of the file, or its path relative to the directory
+        :param data: Data to write to the file, can be a string, bytes, a binary file-like object (such as BytesIO)
+            or an iterable of byte chunks
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :param overwrite: Whether to replace an existing file. If False, the file is only created if it does not exist yet
+        :raises ResourceExistsError: If overwrite is False and the file exists
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        directory_name, file_name = self._split_file_path(directory_name, file_name)
+
+        # Validate the data before creating the file.
+        chunks = self._iter_chunks(data)
+
+        # Ensure the file system and temporary directory exist, and create a uniquely named temporary file.
+        temp_directory = f"{directory_name}/{TEMP_DIRECTORY}"
+        temp_name = f"{file_name}.{uuid.uuid4().hex}"
+        file_client = self._prepare_file_client(file_system_name, temp_directory, temp_name)
+
+        # Write data to the temporary file.
+        try:
+            size = self._write_to_file(file_client, chunks)
+        except Exception:
+            self._delete_temporary_file(file_client)
+            raise
+
+        # Commit the file by renaming it to its target path.
+        self._commit_file(file_client, file_system_name, directory_name, file_name, overwrite)
+
+        logging.info(f"Data written to '{file_system_name}/{directory_name}/{file_name}' successfully ({size} bytes).")
+
+    def read_data(self, file_name: str, file_system_name: str = None, directory_name: str = None) -> bytes:
+        """
+        Read the contents of a file in Azure Data Lake Storage.
+
+        :param file_name: Name of the file, or its path relative to the directory
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :return: The contents of the file, or None if the file does not exist
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+
+        file_client = self._get_file_system_client(file_system_name).get_file_client(f"{directory_name}/{file_name}")
+        try:
+            return file_client.download_file().readall()
+        except ResourceNotFoundError:
+            logging.info(f"File '{file_system_name}/{directory_name}/{file_name}' does not exist.")
+            return None
+        except HttpResponseError as e:
+            logging.error(f"Failed to read file '{file_system_name}/{directory_name}/{file_name}': {e}")
+            raise
+
+    def file_exists(self, file_name: str, file_system_name: str = None, directory_name: str = None) -> bool:
+        """
+        Check whether a committed file exists in Azure Data Lake Storage.
+
+        :param file_name: Name of the file, or its path relative to the directory
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :return: True if the file exists, False otherwise
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        return self._get_file_system_client(file_system_name).get_file_client(f"{directory_name}/{file_name}").exists()
+
+    def reserve_file_name(self,
+                          idempotency_key: str,
+                          file_name: str,
+                          cursor: str = None,
+                          file_system_name: str = None,
+                          directory_name: str = None) -> Tuple[str, bool]:
+        """
+        Reserve a file name for an idempotency key, before the data of the file is written.
+
+        The first reservation of a key creates a commit record with the file name and the cursor up to which
+        the data of the file is read. The record is only created if it does not exist yet, so of two runs
+        reserving the same key at the same time only one creates it, and the other gets the recorded file name.
+        Later reservations of the same key return the recorded file name instead, so a retried write goes to
+        the same file rather than a new one, and report whether mark_committed has been called for the key so
+        the write can be skipped.
+
+        :param idempotency_key: A key identifying the data of the file, e.g. a hash of the cursor it is read after
+        :param file_name: The file name to reserve if the key has not been reserved yet
+        :param cursor: The cursor up to which the data of the file is read, returned by get_reservation
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :return: The reserved file name, and True if the files for the key have already been committed
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        record_directory = f"{directory_name}/{COMMITS_DIRECTORY}"
+
+        record = self._read_commit_record(idempotency_key, file_system_name, record_directory)
+        if record is None:
+            record = {"file": file_name, "cursor": cursor, "committed": False}
+            try:
+                self.write_data(idempotency_key, json.dumps(record), file_system_name, record_directory, overwrite=False)
+                return file_name, False
+            except ResourceExistsError:
+                # Another run reserved the key since it was read.
+                record = self._read_commit_record(idempotency_key, file_system_name, record_directory)
+
+        logging.info(f"Idempotency key '{idempotency_key}' is reserved for '{record['file']}' (committed: {record['committed']}).")
+        return record["file"], record["committed"]
+
+    def get_reservation(self, idempotency_key: str, file_system_name: str = None, directory_name: str = None) -> Optional[dict]:
+        """
+        Get the commit record of a reserved idempotency key.
+
+        :param idempotency_key: The idempotency key passed to reserve_file_name
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :return: The reserved file name ("file"), the cursor passed to reserve_file_name ("cursor") and whether
+            the files have been committed ("committed"), or None if the key has not been reserved
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        return self._read_commit_record(idempotency_key, file_system_name, f"{directory_name}/{COMMITS_DIRECTORY}")
+
+    def mark_committed(self, idempotency_key: str, cursor: str = None, file_system_name: str = None, directory_name: str = None) -> None:
+        """
+        Record that all files for a reserved idempotency key have been written.
+
+        :param idempotency_key: The idempotency key passed to reserve_file_name
+        :param cursor: The cursor up to which the data of the files was read, if it differs from the reserved cursor
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :raises ValueError: If the key has not been reserved
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        record_directory = f"{directory_name}/{COMMITS_DIRECTORY}"
+
+        record = self._read_commit_record(idempotency_key, file_system_name, record_directory)
+        if record is None:
+            raise ValueError(f"Idempotency key '{idempotency_key}' has not been reserved.")
+        record["committed"] = True
+        if cursor is not None:
+            record["cursor"] = cursor
+        self.write_data(idempotency_key, json.dumps(record), file_system_name, record_directory)
+
+    def _read_commit_record(self, idempotency_key: str, file_system_name: str, record_directory: str) -> Optional[dict]:
+        """
+        Read the commit record of an idempotency key.
+
+        :param idempotency_key: The idempotency key
+        :param file_system_name: Name of the file system (container)
+        :param record_directory: Name of the directory of the commit records
+        :return: The commit record, or None if the key has not been reserved
+        """
+        record = self.read_data(idempotency_key, file_system_name, record_directory)
+        return json.loads(record) if record else None
+
+    def list_files(self, file_system_name: str = None, directory_name: str = None) -> List[str]:
+        """
+        List the committed files in a directory and its subdirectories.
+
+        Files in directories starting with an underscore, such as temporary files and commit records, are not listed.
+
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :return: The paths of the files relative to the directory
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
         file_system_client = self._get_file_system_client(file_system_name)
 
-        # Ensure the directory exists.
-        self._ensure_directory_exists(file_system_client, directory_name)
+        files = []
+        try:
+            for path in file_system_client.get_paths(path=directory_name, recursive=True):
+                relative_path = path.name[len(directory_name) + 1:]
+                if path.is_directory or any(segment.startswith("_") for segment in relative_path.split("/")):
+                    continue
+                files.append(relative_path)
+        except ResourceNotFoundError:
+            logging.info(f"Directory '{file_system_name}/{directory_name}' does not exist.")
+        return files
 
-        # Create or get the file client.
-        file_client = self._get_file_client(file_system_client, directory_name, file_name)
+    def move_file(self, source_file_name: str, target_file_name: str, file_system_name: str = None, directory_name: str = None) -> None:
+        """
+        Move a file within a directory with a single rename, replacing any existing target file.
 
-        # Handle BytesIO data
-        if isinstance(data, BytesIO):
-            data.seek(0)  # Move to the start of the BytesIO buffer
-            bytes_data = data.read()
-        elif isinstance(data, str):
-            bytes_data = data.encode('utf-8')  # Convert string data to bytes
-        else:
-            raise ValueError("Data must be a string or BytesIO object.")
+        :param source_file_name: Name of the file, or its path relative to the directory
+        :param target_file_name: New name of the file, or its new path relative to the directory
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        target_directory, target_name = self._split_file_path(directory_name, target_file_name)
+        file_system_client = self._get_file_system_client(file_system_name)
+        self._ensure_directory_exists(file_system_client, target_directory)
 
-        # Write data to the file.
-        self._write_to_file(file_client, bytes_data)
+        file_client = file_system_client.get_file_client(f"{directory_name}/{source_file_name}")
+        try:
+            file_client.rename_file(f"{file_system_name}/{target_directory}/{target_name}")
+        except HttpResponseError as e:
+            logging.error(f"Failed to move '{source_file_name}' to '{target_file_name}' in '{file_system_name}/{directory_name}': {e}")
+            raise
 
-        logging.info(f"Data written to '{file_system_name}/{directory_name}/{file_name}' successfully.")
+    def delete_file(self, file_name: str, file_system_name: str = None, directory_name: str = None) -> bool:
+        """
+        Delete a file.
+
+        :param file_name: Name of the file, or its path relative to the directory
+        :param file_system_name: Name of the file system (container), uses default if not specified
+        :param directory_name: Name of the directory, uses default if not specified
+        :return: True if the file was deleted, False if it did not exist
+        """
+        file_system_name, directory_name = self._resolve_location(file_system_name, directory_name)
+        file_client = self._get_file_system_client(file_system_name).get_file_client(f"{directory_name}/{file_name}")
+        try:
+            file_client.delete_file()
+            logging.info(f"Deleted file '{file_system_name}/{directory_name}/{file_name}'.")
+            return True
+        except ResourceNotFoundError:
+            return False
 
     def delete_all_folders(self, file_system_name: str = None) -> None:
         """
@@ -182,4 +594,6 @@ class DataLakeWriter:
                     
         except HttpResponseError as e:
             logging.error(f"Failed to delete directories in file system '{file_system_name}': {e}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            self._invalidate_existence_cache(file_system_name)
\ No newline at end of file
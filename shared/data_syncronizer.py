@@ -1,12 +1,21 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import hashlib
 import logging
-from shared.delta_fetcher import DeltaFetcher
-from shared.item_fetcher import ItemFetcher
+from shared.delta_fetcher import DeltaFetcher, DeltasResult
+from shared.gql_client import GraphQLPaginationException
+from shared.item_fetcher import ItemFetcher, ItemsResult
 from shared.data_lake_writer import DataLakeWriter
 from shared.configuration_manager import SynchronizerStateManager
-from shared.utils.data_transformation import flatten_list_of_dicts
-from shared.utils.time import get_current_time_for_filename
-from shared.utils.files import convert_dicts_to_parquet_pandas
+from shared.parquet_part_writer import ParquetPartWriter
+from shared.partitioning import Partitioning, partition_table, partition_file_path
+from shared.snapshot_merger import SnapshotMerger
+from shared.sync_pipeline import SyncPipeline
+from shared.transform_pool import TransformPool
+import pyarrow as pa
+from shared.utils.arrow import CATEGORY, build_arrow_schema, convert_nodes_to_arrow_table
+from shared.utils.time import get_current_time_for_filename, parse_time_from_filename
+from shared.utils.files import ParquetOptions, convert_arrow_table_to_parquet
 
 
 class DataSynchronizer:
@@ -17,14 +26,25 @@ class DataSynchronizer:
     data from is defined in the item_fetcher and delta_fetcher.
 
     Full syncronization: 
-    The synchronizer fetches all items and writes them to the data lake. The state manager updates the
+    The synchronizer fetches all items page by page and writes them to the data lake as a sequence of
+    bounded-size Parquet part files, followed by a manifest listing the parts. The state manager updates the
     state in Azure Blob Storage with the cursor of the last item fetched, and whether the syncronization completed or not.
+    Fetching, converting pages to Arrow tables and writing parts run as a pipeline on separate threads, connected
+    by queues of at most pipeline_queue_size items, so the next pages are fetched while a part is written.
+    With transform_workers, the pages are converted in a pool of worker processes instead, using more than one core.
 
     Syncronize changes:
     The synchronizer uses a DeltaFetcher to get the the dbIds and which type of change occured (addition, update or deletion).
     An ItemFetcher is used to fetch the items based on the dbIds. The items are then transformed and written to the data lake.
-    The state manager updates the state of Azure to keep track of the last delta processed.
+    The state manager updates the state of Azure to keep track of the last delta processed. The output file is
+    reserved for the cursor the deltas are fetched after, together with the cursor of the last delta, so a run that
+    wrote its file but failed to update the state is retried without fetching or writing the items again, and a run
+    that failed before committing its file is retried with the same range of deltas.
 
+    Snapshot:
+    With a SnapshotMerger, the synchronizer also maintains a snapshot with the current state of every item. It is
+    rebuilt from the files of every completed full syncronization, and every batch of changes is merged into it
+    before the batch is marked as committed.
 
     Attributes:
     name (str): The name of the synchronizer.
@@ -33,6 +53,14 @@ class DataSynchronizer:
     item_fetcher (ItemFetcher): The instance to fetch items.
     data_lake_writer (DataLakeWriter): The instance to write data to the data lake.
     state_manager (SynchronizerStateManager): The instance to manage synchronization state.
+    part_max_rows (Optional[int]): The maximum number of rows per Parquet part in a full synchronization.
+    part_max_bytes (Optional[int]): The approximate maximum number of bytes per Parquet part in a full synchronization.
+    schema (pa.Schema): The Arrow schema of the Parquet files, built from the columns and their declared types.
+    parquet_options (Optional[ParquetOptions]): The options for writing the Parquet files.
+    partitioning (Optional[Partitioning]): The partitioned layout of the Parquet files, or None for a flat layout.
+    snapshot_merger (Optional[SnapshotMerger]): The instance maintaining the snapshot, or None for no snapshot.
+    pipeline_queue_size (int): The maximum number of pages waiting between the stages of a full synchronization, or 0 to run them sequentially.
+    transform_workers (int): The number of worker processes converting pages in a full synchronization, or 0 to convert them on a thread.
     """
 
     def __init__(self, 
@@ -42,7 +70,15 @@ class DataSynchronizer:
                  data_lake_writer: DataLakeWriter,
                  state_manager: SynchronizerStateManager,
                  delta_fetcher: Optional[DeltaFetcher] = None,
-                 add_mutation_type_to_columns: bool = True) -> None:
+                 add_mutation_type_to_columns: bool = True,
+                 part_max_rows: Optional[int] = 100000,
+                 part_max_bytes: Optional[int] = 128 * 1024 * 1024,
+                 column_types: Optional[Dict[str, pa.DataType]] = None,
+                 parquet_options: Optional[ParquetOptions] = None,
+                 partitioning: Optional[Partitioning] = None,
+                 snapshot_merger: Optional[SnapshotMerger] = None,
+                 pipeline_queue_size: int = 2,
+                 transform_workers: int = 0) -> None:
         """
         Initialize a new instance of DataSynchronizer.
 
@@ -53,16 +89,35 @@ class DataSynchronizer:
         data_lake_writer (DataLakeWriter): The instance used to write data to the data lake.
         state_manager (SynchronizerStateManager): The instance used to manage synchronization state.
         delta_fetcher (Optional[DeltaFetcher]): The instance to fetch deltas (added, updated, or deleted items).
+        add_mutation_type_to_columns (bool): If True, a mutationType column is added to the columns.
+        part_max_rows (Optional[int]): The maximum number of rows per Parquet part in a full synchronization. None for no limit.
+        part_max_bytes (Optional[int]): The approximate maximum number of bytes per Parquet part in a full synchronization. None for no limit.
+        column_types (Optional[Dict[str, pa.DataType]]): The Arrow type of each column that is not a string.
+        parquet_options (Optional[ParquetOptions]): The options for writing the Parquet files. Defaults to the pyarrow defaults.
+        partitioning (Optional[Partitioning]): The partitioned layout of the Parquet files. Defaults to a flat layout.
+        snapshot_merger (Optional[SnapshotMerger]): The instance maintaining the snapshot. Defaults to no snapshot.
+        pipeline_queue_size (int): The maximum number of pages waiting between the stages of a full synchronization. 0 runs them sequentially.
+        transform_workers (int): The number of worker processes converting pages in a full synchronization. Defaults to 0, converting them on a thread.
         """
         self.name = name
         self.delta_fetcher = delta_fetcher
         self.item_fetcher = item_fetcher
         self.state_manager = state_manager
         self.data_lake_writer = data_lake_writer
-        self.columns = columns
+        self.columns = list(columns)
+        self.part_max_rows = part_max_rows
+        self.part_max_bytes = part_max_bytes
+        self.parquet_options = parquet_options
+        self.partitioning = partitioning
+        self.snapshot_merger = snapshot_merger
+        self.pipeline_queue_size = pipeline_queue_size
+        self.transform_workers = transform_workers
 
+        column_types = dict(column_types or {})
         if add_mutation_type_to_columns:
             self.columns.append("mutationType")
+            column_types["mutationType"] = CATEGORY
+        self.schema = build_arrow_schema(self.columns, column_types)
 
     def syncronize(self, sync_from_scratch: bool) -> None:
         """
@@ -83,67 +138,272 @@ class DataSynchronizer:
     def _full_syncronization(self) -> None:
         """
         Perform a full synchronization of data.
+
+        The synchronization is checkpointed after every written part: the cursor of the last written item
+        and the name of the run are persisted, so a run that is interrupted (e.g. by the execution time limit)
+        is resumed from its last checkpoint on the next invocation instead of starting from scratch.
         """
-        # Get the last delta.
-        deltas = None
-        if self.delta_fetcher:
-            deltas = self.delta_fetcher.fetch_deltas({"last": 1})
-        
-        # Fetch all items.
-        items = self.item_fetcher.fetch_all_items_after_cursor(first=10000)
-        if not items.has_items():
+        run_name = self.state_manager.initial_sync_run
+        if run_name:
+            # Resume the interrupted run after the last written part.
+            parts = self._load_full_sync_parts(run_name)
+            part_writer = self._create_part_writer(run_name, parts)
+            after = part_writer.last_cursor or self.state_manager.initial_sync_cursor
+            deltas = None
+            run_persisted = True
+            logging.info(f"Resuming full synchronization {run_name} for {self.name} after {len(parts)} parts.")
+        else:
+            # Get the last delta.
+            deltas = None
+            if self.delta_fetcher:
+                deltas = self.delta_fetcher.fetch_deltas({"last": 1})
+
+            run_name = f"full_sync-{get_current_time_for_filename()}-{self.name}"
+            part_writer = self._create_part_writer(run_name)
+            after = None
+            run_persisted = False
+
+        # Fetch all items page by page and write them as bounded-size parts. If a page fails after its
+        # retries, the pages fetched before it are written and checkpointed, so the next run continues
+        # after them instead of fetching them again.
+        try:
+            pages = self.item_fetcher.iter_items_after_cursor(after=after, first=10000)
+            for table, cursor in self._iter_tables(pages, part_writer):
+                part = part_writer.add_table(table, cursor)
+                if part:
+                    self._checkpoint_full_syncronization(run_name, part["cursor"], deltas, run_persisted)
+                    run_persisted = True
+        except GraphQLPaginationException as e:
+            part = part_writer.flush()
+            if part:
+                logging.warning(f"Full synchronization of {self.name} failed after {e.pages} pages; "
+                                f"checkpointed the fetched items up to cursor {part['cursor']}.")
+                self._checkpoint_full_syncronization(run_name, part["cursor"], deltas, run_persisted)
+            raise
+
+        if part_writer.total_rows == 0:
             logging.info(f"No items found for {self.name}.")
             return
-        
-        # Transform items.
-        items.add_key_value_to_items("mutationType", "ADDED")
-        items_transformed = convert_dicts_to_parquet_pandas(flatten_list_of_dicts(items.get_items()), self.columns)
 
-        # Write items to data lake.
-        self.data_lake_writer.write_data(f"full_sync-{get_current_time_for_filename()}-{self.name}.parquet", items_transformed)
+        # Write the remaining items and the manifest to the data lake.
+        manifest = part_writer.close()
+
+        # Replace the snapshot with the items of this run.
+        if self.snapshot_merger:
+            files = [file for part in manifest["parts"] for file in part["files"]]
+            self.snapshot_merger.rebuild(run_name, files, part_writer.sync_time)
 
         # Update state.
-        self.state_manager.initial_sync_cursor = items.get_last_item_cursor()
+        self.state_manager.initial_sync_cursor = part_writer.last_cursor
         self.state_manager.initial_sync_complete = True
-        if deltas:
+        self.state_manager.initial_sync_run = ""
+        if deltas and not run_persisted:
             self.state_manager.deltas_cursor = deltas.last_cursor
+        self.state_manager.commit()
 
         # Can call _syncronize_changes here to get the changes since the full sync.
         # Use the last delta fetched at the beginning of this function.
 
+    def _iter_tables(self, pages: Iterable[ItemsResult], part_writer: ParquetPartWriter) -> Iterator[Tuple[pa.Table, str]]:
+        """
+        Convert pages of items to Arrow tables. The pages are fetched and converted on separate threads,
+        ahead of the caller, unless pipeline_queue_size is 0. With transform_workers, the pages are
+        converted in worker processes.
+
+        Args:
+        pages (Iterable[ItemsResult]): The pages of items.
+        part_writer (ParquetPartWriter): The part writer the tables are converted for.
+
+        Returns:
+        Iterator[Tuple[pa.Table, str]]: The table of each page and the cursor of its last item, in order.
+        """
+        def convert(page: ItemsResult) -> Tuple[pa.Table, str]:
+            return part_writer.to_table(page.get_items()), page.get_last_item_cursor()
+
+        if self.transform_workers:
+            return self._iter_tables_in_processes(pages, part_writer)
+        if not self.pipeline_queue_size:
+            return (convert(page) for page in pages)
+        return iter(SyncPipeline(pages, [convert], self.pipeline_queue_size, name=self.name))
+
+    def _iter_tables_in_processes(self, pages: Iterable[ItemsResult], part_writer: ParquetPartWriter) -> Iterator[Tuple[pa.Table, str]]:
+        """
+        Convert pages of items to Arrow tables in a pool of transform_workers worker processes. The pages
+        are fetched on a separate thread, ahead of the conversions, unless pipeline_queue_size is 0.
+
+        Args:
+        pages (Iterable[ItemsResult]): The pages of items.
+        part_writer (ParquetPartWriter): The part writer the tables are converted for.
+
+        Yields:
+        Tuple[pa.Table, str]: The table of each page and the cursor of its last item, in order.
+        """
+        if self.pipeline_queue_size:
+            pages = SyncPipeline(pages, [], self.pipeline_queue_size, name=self.name)
+
+        with TransformPool(self.transform_workers, part_writer.columns, part_writer.constant_columns, part_writer.schema) as pool:
+            yield from pool.map_pages(pages)
+
+    def _create_part_writer(self, run_name: str, parts: Optional[List[Dict[str, Any]]] = None) -> ParquetPartWriter:
+        """
+        Create the part writer of a full synchronization run. Every item of a full synchronization is an addition.
+
+        Args:
+        run_name (str): The name of the full synchronization run.
+        parts (Optional[List[Dict[str, Any]]]): The parts already written by an interrupted run, to continue from.
+
+        Returns:
+        ParquetPartWriter: The part writer.
+        """
+        return ParquetPartWriter(
+            self.data_lake_writer,
+            run_name,
+            self.columns,
+            self.part_max_rows,
+            self.part_max_bytes,
+            parts,
+            constant_columns={"mutationType": "ADDED"},
+            schema=self.schema,
+            parquet_options=self.parquet_options,
+            partitioning=self.partitioning,
+            sync_time=parse_time_from_filename(run_name),
+        )
+
+    def _checkpoint_full_syncronization(self,
+                                        run_name: str,
+                                        cursor: str,
+                                        deltas: Optional[DeltasResult],
+                                        run_persisted: bool) -> None:
+        """
+        Persist the progress of a full synchronization after a part has been written.
+
+        Args:
+        run_name (str): The name of the full synchronization run.
+        cursor (str): The cursor of the last item written.
+        deltas (Optional[DeltasResult]): The last delta fetched at the start of the run.
+        run_persisted (bool): True if the run and its last delta have already been persisted by an earlier checkpoint.
+        """
+        self.state_manager.initial_sync_cursor = cursor
+        if not run_persisted:
+            if deltas:
+                self.state_manager.deltas_cursor = deltas.last_cursor
+            self.state_manager.initial_sync_run = run_name
+        self.state_manager.commit()
+
+    def _load_full_sync_parts(self, run_name: str) -> List[Dict[str, Any]]:
+        """
+        Load the parts already written by an interrupted full synchronization from its manifest.
+
+        Args:
+        run_name (str): The name of the full synchronization run.
+
+        Returns:
+        List[Dict[str, Any]]: The parts listed in the manifest, or an empty list if no manifest was written.
+        """
+        manifest = self.data_lake_writer.read_data(ParquetPartWriter.manifest_name(run_name))
+        if not manifest:
+            return []
+        return json.loads(manifest)["parts"]
+
     def _syncronize_changes(self) -> None:
         """
         Synchronize only the changes (additions, updates, deletions) since the last synchronization.
         """
-        # Get all deltas since last sync.
-        deltas = self.delta_fetcher.fetch_deltas({"first": 10000, "after": self.state_manager.deltas_cursor})
+        # The file of the changes after the cursor is reserved by the first run that synchronizes them. If a
+        # previous run already wrote it but failed to update the state, only the state is updated.
+        after = self.state_manager.deltas_cursor
+        idempotency_key = self._idempotency_key(after)
+        reservation = self.data_lake_writer.get_reservation(idempotency_key)
+        if reservation and reservation["committed"]:
+            logging.info(f"Changes for {self.name} were already written to {reservation['file']}.")
+            self.state_manager.deltas_cursor = reservation["cursor"]
+            self.state_manager.commit()
+            return
+
+        # Get all deltas since last sync. A retried run fetches the same range of deltas as the run that
+        # reserved the file, so it writes and merges the same changes.
+        until_cursor = reservation["cursor"] if reservation else None
+        deltas = self.delta_fetcher.fetch_deltas({"first": 10000, "after": after}, until_cursor)
 
         # No new changes found -> return.
         if not deltas.has_changes():
             logging.info(f"No changes found for {self.name}.")
             return
-        
-        # Get all items based from the dbids fetched with the delta_fetcher.
-        all_changed_items = []
+        if not deltas.complete:
+            logging.warning(f"Synchronizing the changes of {self.name} up to cursor {deltas.last_cursor}; "
+                            f"the remaining changes are synchronized by the next run.")
+        if until_cursor is not None and deltas.last_cursor != until_cursor:
+            logging.warning(f"The changes of {self.name} up to cursor {until_cursor} reserved by a previous run are no longer "
+                            f"available; synchronizing the changes up to cursor {deltas.last_cursor} instead.")
+
+        # The file name ends with part of the idempotency key, so runs started in the same second get different files.
+        batch_id = idempotency_key.rpartition("-")[2][:8]
+        new_file_name = f"sync_changes-{get_current_time_for_filename()}-{self.name}-{batch_id}.parquet"
+        file_name, committed = self.data_lake_writer.reserve_file_name(idempotency_key, new_file_name, deltas.last_cursor)
+        if committed or (reservation is None and file_name != new_file_name):
+            logging.info(f"Changes for {self.name} are being written to {file_name} by a concurrent run.")
+            return
+
+        # Get all items based from the dbids fetched with the delta_fetcher, and transform them
+        # to one table per type of change. Additions and updates are fetched concurrently.
+        additions, updates = self.item_fetcher.fetch_items_by_id_lists([deltas.get_additions(), deltas.get_updates()])
+        tables = []
         if deltas.has_additions():
-            additions = self.item_fetcher.fetch_items_by_ids(deltas.get_additions())
-            additions.add_key_value_to_items("mutationType", "ADDED")
-            all_changed_items.extend(additions.get_items())
+            tables.append(self._to_table(additions.get_items(), "ADDED"))
 
         if deltas.has_updates():
-            updates = self.item_fetcher.fetch_items_by_ids(deltas.get_updates())
-            updates.add_key_value_to_items("mutationType", "UPDATED")
-            all_changed_items.extend(updates.get_items())
+            tables.append(self._to_table(updates.get_items(), "UPDATED"))
 
         if deltas.has_deletions():
-            deletions = [{"dbId": dbId, "mutationType": "DELETED"} for dbId in deltas.get_deletions()]
-            all_changed_items.extend(deletions)
+            deletions = [{"dbId": dbId} for dbId in deltas.get_deletions()]
+            tables.append(self._to_table(deletions, "DELETED"))
 
-        # Transform items.
-        parquet = convert_dicts_to_parquet_pandas(flatten_list_of_dicts(all_changed_items), self.columns)
+        # Combine the tables, which all have the schema of the synchronizer.
+        table = pa.concat_tables(tables)
 
-        # Write items to data lake.
-        self.data_lake_writer.write_data(f"sync_changes-{get_current_time_for_filename()}-{self.name}.parquet", parquet)
+        # Write items to data lake, one file per partition. The synchronization time is taken from the
+        # reserved file name, so a retried run writes to the same partitions. Only a retried run may replace
+        # existing files, which are its own; any other existing file means the file names collided.
+        sync_time = parse_time_from_filename(file_name)
+        for partition, partition_rows in partition_table(self.partitioning, table, sync_time):
+            parquet = convert_arrow_table_to_parquet(partition_rows, self.parquet_options)
+            self.data_lake_writer.write_data(partition_file_path(partition, file_name), parquet,
+                                             overwrite=reservation is not None)
+
+        # Merge the changes into the snapshot before the file is marked as committed, so a committed file is
+        # always in the snapshot. A retried run that already merged them is skipped by the merger.
+        if self.snapshot_merger:
+            self.snapshot_merger.apply(table, sync_time, idempotency_key)
+        self.data_lake_writer.mark_committed(idempotency_key, deltas.last_cursor)
 
         # Update state.
-        self.state_manager.deltas_cursor = deltas.last_cursor
\ No newline at end of file
+        self.state_manager.deltas_cursor = deltas.last_cursor
+        self.state_manager.commit()
+
+    def _to_table(self, items: List[Dict[str, Any]], mutation_type: str) -> pa.Table:
+        """
+        Convert items with the same type of change to an Arrow table with the columns of the synchronizer.
+
+        Args:
+        items (List[Dict[str, Any]]): The (nested) items.
+        mutation_type (str): The type of change of the items: ADDED, UPDATED or DELETED.
+
+        Returns:
+        pa.Table: The table.
+        """
+        return convert_nodes_to_arrow_table(items, self.columns, {"mutationType": mutation_type}, self.schema)
+
+    def _idempotency_key(self, after: Optional[str]) -> str:
+        """
+        Derive the idempotency key of a change synchronization from the cursor its deltas are fetched after.
+        The cursor of the last delta is recorded in the reservation instead, so a retried run that finds newer
+        deltas still gets the same key.
+
+        Args:
+        after (Optional[str]): The cursor the deltas are fetched after.
+
+        Returns:
+        str: The idempotency key.
+        """
+        cursor = f"{self.name}:{after or ''}"
+        return f"sync_changes-{hashlib.sha256(cursor.encode('utf-8')).hexdigest()[:32]}"
\ No newline at end of file
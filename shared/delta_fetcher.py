@@ -1,5 +1,5 @@
-from shared.gql_client import GraphQLClient, PaginationQueryResult
-from typing import Dict, Any
+from shared.gql_client import GraphQLClient, GraphQLPaginationException, PaginationQueryResult
+from typing import Dict, Any, Iterable, Optional
 import logging
 
 
@@ -14,9 +14,10 @@ class DeltasResult:
     updates (set): A set of dbIds corresponding to a GraphQL item that has been updated.
     deletions (set): A set of dbIds corresponding to a GraphQL item that has been deleted.
     last_cursor (str): The cursor for the last processed item.
+    complete (bool): False if fetching the deltas failed part-way and only the deltas up to last_cursor were fetched.
     """
 
-    def __init__(self, additions: set, updates: set, deletions: set, last_cursor: str) -> None:
+    def __init__(self, additions: set, updates: set, deletions: set, last_cursor: str, complete: bool = True) -> None:
         """
         Initialize a new instance of DeltasResult.
 
@@ -25,11 +26,13 @@ class DeltasResult:
         updates (set): A set of dbIds corresponding to a GraphQL item that has been updated.
         deletions (set): A set of dbIds corresponding to a GraphQL item that has been deleted.
         last_cursor (str): The cursor of the last delta processed.
+        complete (bool): False if only the deltas up to last_cursor were fetched. Defaults to True.
         """
         self.additions = additions
         self.updates = updates
         self.deletions = deletions
         self.last_cursor = last_cursor
+        self.complete = complete
 
     def has_changes(self) -> bool:
         """
@@ -117,12 +120,17 @@ class DeltaFetcher:
         self.graphql_client = client
         self.query = query
 
-    def fetch_deltas(self, variables: Dict[str, Any]) -> DeltasResult:
+    def fetch_deltas(self, variables: Dict[str, Any], until_cursor: Optional[str] = None) -> DeltasResult:
         """
         Fetch deltas (items that have been added, updated, or deleted) based on the provided variables.
 
+        If a page fails after some pages have been fetched, the deltas of those pages are returned as an
+        incomplete result, so they can be processed and the next synchronization continues after them.
+
         Args:
         variables (Dict[str, Any]): A dictionary of variables to pass to the GraphQL query.
+        until_cursor (Optional[str]): The cursor of the last delta to fetch, e.g. to fetch the same range of deltas
+            as an earlier run. Defaults to fetching all deltas.
 
         Returns:
         DeltasResult: The result of the deltas.
@@ -131,30 +139,21 @@ class DeltaFetcher:
         Exception: If an error occurs while fetching deltas.
         """
         try:
-            query_result = self._execute_paginated_query(variables)
-            return self._extract_deltas(query_result)
+            pages = self.graphql_client.iter_pages(self.query, variables)
+            return self._extract_deltas(pages, until_cursor)
         except Exception as e:
             logging.error(f"Error fetching deltas: {e}")
             raise
 
-    def _execute_paginated_query(self, variables: Dict[str, Any]) -> PaginationQueryResult:
-        """
-        Execute a paginated GraphQL query.
-
-        Args:
-        variables (Dict[str, Any]): A dictionary of variables to pass to the GraphQL query.
-
-        Returns:
-        PaginationQueryResult: The result of the paginated query.
-        """
-        return self.graphql_client.paginate_gql_query(self.query, variables)
-
-    def _extract_deltas(self, result: PaginationQueryResult) -> DeltasResult:
+    def _extract_deltas(self, pages: Iterable[PaginationQueryResult], until_cursor: Optional[str] = None) -> DeltasResult:
         """
-        Extract deltas (items that have been added, updated, or deleted) from the paginated query result.
+        Extract deltas (items that have been added, updated, or deleted) from the pages of a paginated query.
+        Pages are consumed one at a time, so only the dbId sets are kept in memory. If the pagination fails
+        after the first page, the deltas of the pages fetched so far are returned as an incomplete result.
 
         Args:
-        result (PaginationQueryResult): The result of the paginated query.
+        pages (Iterable[PaginationQueryResult]): The pages of the paginated query.
+        until_cursor (Optional[str]): The cursor of the last delta to extract. Defaults to extracting all deltas.
 
         Returns:
         DeltasResult: The extracted deltas.
@@ -162,24 +161,36 @@ class DeltaFetcher:
         additions = set()
         updates = set()
         deletions = set()
+        last_cursor = None
+        complete = True
 
-        if not result.has_results():
-            return DeltasResult(additions, updates, deletions, result.get_last_cursor())
-
-        for edge in result.edges:
-            node = edge['node']
-            mutation_type = node.get('mutationType')
-            db_id = node.get('dbId')
-
-            if mutation_type == "DELETED":
-                deletions.add(db_id)
-            elif mutation_type == "UPDATED":
-                updates.add(db_id)
-            elif mutation_type == "ADDED":
-                additions.add(db_id)
+        try:
+            for page in pages:
+                for edge in page.edges:
+                    node = edge['node']
+                    mutation_type = node.get('mutationType')
+                    db_id = node.get('dbId')
+
+                    if mutation_type == "DELETED":
+                        deletions.add(db_id)
+                    elif mutation_type == "UPDATED":
+                        updates.add(db_id)
+                    elif mutation_type == "ADDED":
+                        additions.add(db_id)
+
+                    last_cursor = edge['cursor']
+                    if until_cursor is not None and last_cursor == until_cursor:
+                        break
+                if until_cursor is not None and last_cursor == until_cursor:
+                    break
+        except GraphQLPaginationException as e:
+            if not e.pages:
+                raise
+            logging.warning(f"Fetching deltas failed after {e.pages} pages, continuing with the deltas fetched so far: {e.error}")
+            complete = False
 
         # Ensure no updates or additions are in deletions.
         updates -= deletions
         additions -= deletions
 
-        return DeltasResult(additions, updates, deletions, result.get_last_cursor())
+        return DeltasResult(additions, updates, deletions, last_cursor, complete)
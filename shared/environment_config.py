@@ -1,5 +1,6 @@
 import os
 import logging
+import tempfile
 
 class EnvironmentConfig:
     """
@@ -14,7 +15,29 @@ class EnvironmentConfig:
         api_key (str): The API key for the GraphQL client.
         data_storage_account (str): The name of the data storage account.
         data_storage_container (str): The name of the data storage container.
-        app_config_endpoint (str): The endpoint for the app configuration.
+        app_config_endpoint (str): The endpoint for the app configuration. Only required for the app_configuration state backend.
+        state_backend (str): Where the synchronizer state is stored: app_configuration, file or blob.
+        state_file_path (str): The path of the state file for the file state backend.
+        state_blob_container (str): The container in the data storage account for the blob state backend.
+        full_sync_part_max_rows (int): The maximum number of rows per Parquet part in a full sync.
+        full_sync_part_max_bytes (int): The approximate maximum number of bytes per Parquet part in a full sync.
+        fetch_id_chunk_size (int): The maximum number of dbIds sent in a single query when fetching items by dbId.
+        fetch_max_concurrency (int): The maximum number of queries in flight when fetching items by dbId.
+        graphql_schema_path (str): The path of the local GraphQL schema cache.
+        graphql_schema_ttl (int): The number of seconds after which the cached GraphQL schema is refreshed.
+        graphql_validate_schema (bool): Whether GraphQL queries are validated against the schema.
+        api_rate_limit (int): The maximum number of GraphQL requests per second of the worker process, or 0 for no limit.
+        api_rate_burst (int): The maximum number of GraphQL requests sent in a burst.
+        page_size_min (int): The smallest page size paginated queries are reduced to when the API times out or throttles.
+        page_size_max (int): The largest page size of paginated queries.
+        page_target_seconds (int): The response time the page size of paginated queries is adapted to.
+        sync_max_concurrency (int): The maximum number of entities synchronized at the same time.
+        sync_priority (list): Entities to synchronize before the others, in order.
+        compaction_period (str): The period of the sync_changes files merged into one file: day or month.
+        snapshot_enabled (bool): Whether a snapshot with the current state of each entity is maintained.
+        snapshot_shards (int): The number of files the snapshot of each entity is split into by dbId.
+        sync_pipeline_queue_size (int): The maximum number of pages waiting between the pipelined stages of a full sync, or 0 to run them sequentially.
+        transform_workers (int): The number of worker processes converting pages in a full sync, or 0 to convert them on a thread.
     """
     
     def __init__(self):
@@ -26,7 +49,35 @@ class EnvironmentConfig:
         self.api_key = self.get_env_variable("API_KEY")
         self.data_storage_account = self.get_env_variable("DATA_STORAGE_ACCOUNT_NAME")
         self.data_storage_container = self.get_env_variable("DATA_STORAGE_CONTAINER_NAME")
-        self.app_config_endpoint = self.get_env_variable("APP_CONFIG_ENDPOINT")
+        self.state_backend = os.getenv("STATE_BACKEND", "app_configuration")
+        if self.state_backend not in ("app_configuration", "file", "blob"):
+            logging.error(f"Environment variable 'STATE_BACKEND' has unknown value '{self.state_backend}'.")
+            raise ValueError(f"Environment variable 'STATE_BACKEND' has unknown value '{self.state_backend}'.")
+        if self.state_backend == "app_configuration":
+            self.app_config_endpoint = self.get_env_variable("APP_CONFIG_ENDPOINT")
+        else:
+            self.app_config_endpoint = os.getenv("APP_CONFIG_ENDPOINT")
+        self.state_file_path = os.getenv("STATE_FILE_PATH") or os.path.join(tempfile.gettempdir(), "xledger_state.json")
+        self.state_blob_container = os.getenv("STATE_BLOB_CONTAINER", "synchronizer-state")
+        self.full_sync_part_max_rows = self.get_optional_int_env_variable("FULL_SYNC_PART_MAX_ROWS", 100000)
+        self.full_sync_part_max_bytes = self.get_optional_int_env_variable("FULL_SYNC_PART_MAX_BYTES", 128 * 1024 * 1024)
+        self.fetch_id_chunk_size = self.get_optional_int_env_variable("FETCH_ID_CHUNK_SIZE", 1000)
+        self.fetch_max_concurrency = self.get_optional_int_env_variable("FETCH_MAX_CONCURRENCY", 4)
+        self.graphql_schema_path = os.getenv("GRAPHQL_SCHEMA_PATH") or os.path.join(tempfile.gettempdir(), "xledger_schema.graphql")
+        self.graphql_schema_ttl = self.get_optional_int_env_variable("GRAPHQL_SCHEMA_TTL", 86400)
+        self.graphql_validate_schema = os.getenv("GRAPHQL_VALIDATE_SCHEMA", "true").lower() != "false"
+        self.api_rate_limit = self.get_optional_int_env_variable("API_RATE_LIMIT", 5)
+        self.api_rate_burst = self.get_optional_int_env_variable("API_RATE_BURST", 10)
+        self.page_size_min = self.get_optional_int_env_variable("PAGE_SIZE_MIN", 100)
+        self.page_size_max = self.get_optional_int_env_variable("PAGE_SIZE_MAX", 10000)
+        self.page_target_seconds = self.get_optional_int_env_variable("PAGE_TARGET_SECONDS", 15)
+        self.sync_max_concurrency = self.get_optional_int_env_variable("SYNC_MAX_CONCURRENCY", 2)
+        self.sync_priority = [name.strip() for name in os.getenv("SYNC_PRIORITY", "").split(",") if name.strip()]
+        self.compaction_period = os.getenv("COMPACTION_PERIOD", "month")
+        self.snapshot_enabled = os.getenv("SNAPSHOT_ENABLED", "false").lower() == "true"
+        self.snapshot_shards = self.get_optional_int_env_variable("SNAPSHOT_SHARDS", 16)
+        self.sync_pipeline_queue_size = self.get_optional_int_env_variable("SYNC_PIPELINE_QUEUE_SIZE", 2)
+        self.transform_workers = self.get_optional_int_env_variable("TRANSFORM_WORKERS", 0)
 
     @staticmethod
     def get_env_variable(var_name: str) -> str:
@@ -46,4 +97,28 @@ class EnvironmentConfig:
         if not value:
             logging.error(f"Environment variable '{var_name}' is missing.")
             raise ValueError(f"Environment variable '{var_name}' is missing.")
-        return value
\ No newline at end of file
+        return value
+
+    @staticmethod
+    def get_optional_int_env_variable(var_name: str, default: int = None) -> int:
+        """
+        Fetches an optional integer environment variable.
+
+        Args:
+            var_name (str): The name of the environment variable to fetch.
+            default (int): The value to use if the environment variable is not set.
+
+        Returns:
+            int: The value of the environment variable, or the default if it is not set.
+
+        Raises:
+            ValueError: If the environment variable is not a valid integer.
+        """
+        value = os.getenv(var_name)
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            logging.error(f"Environment variable '{var_name}' must be an integer, got '{value}'.")
+            raise ValueError(f"Environment variable '{var_name}' must be an integer, got '{value}'.")
@@ -1,8 +1,33 @@
+import asyncio
 import logging
-from typing import Dict, List, Any
+import re
+import time
+from typing import Dict, List, Any, Iterator, AsyncIterator, Optional
+from aiohttp import ClientError
 from gql import Client
 from gql.transport.aiohttp import AIOHTTPTransport
-from tenacity import retry, stop_after_attempt, wait_exponential
+from gql.transport.exceptions import TransportClosed, TransportProtocolError, TransportQueryError, TransportServerError
+from graphql import GraphQLError
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+from shared.gql_schema import SchemaCache, refresh_schema_cache
+from shared.throttling import AdaptivePageSize, TokenBucket
+
+
+# HTTP status codes and error messages with which the API asks the client to slow down.
+THROTTLING_STATUS_CODES = (429, 503)
+THROTTLING_MESSAGE_PATTERN = re.compile(r"rate limit|too many requests|throttl", re.IGNORECASE)
+
+# Error codes (in the extensions of a GraphQL error) and messages with which the API rejects an invalid query.
+# Other errors returned by the API, e.g. internal errors while resolving a field, may succeed when retried.
+VALIDATION_ERROR_CODES = ("GRAPHQL_VALIDATION_FAILED", "GRAPHQL_PARSE_FAILED", "BAD_USER_INPUT")
+VALIDATION_MESSAGE_PATTERN = re.compile(r"cannot query field|unknown argument|unknown type|syntax error|"
+                                        r"is not defined|of required type|got invalid value", re.IGNORECASE)
+
+# The number of attempts of a page that failed with a network error, and with any other retriable error.
+# Timeouts and throttling are retried max_page_attempts times, and queries rejected by the local schema
+# validation or the validation of the API are not retried, since they fail the same way every time.
+NETWORK_ATTEMPTS = 5
+QUERY_ATTEMPTS = 3
 
 
 class GraphQLQueryException(Exception):
@@ -10,6 +35,54 @@ class GraphQLQueryException(Exception):
     pass
 
 
+class GraphQLTimeoutException(GraphQLQueryException):
+    """Exception raised when a GraphQL query does not complete within the execution timeout."""
+    pass
+
+
+class GraphQLThrottledException(GraphQLQueryException):
+    """
+    Exception raised when the API throttles a GraphQL query.
+
+    Attributes:
+        retry_after (float): The number of seconds the API asked the client to wait, or None if it gave no hint.
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GraphQLNetworkException(GraphQLQueryException):
+    """Exception raised when a GraphQL query fails because of the connection or a server error."""
+    pass
+
+
+class GraphQLValidationException(GraphQLQueryException):
+    """Exception raised when a GraphQL query is rejected by the schema or by the API. It is never retried."""
+    pass
+
+
+class GraphQLPaginationException(GraphQLQueryException):
+    """
+    Exception raised when a page of a paginated GraphQL query fails after its last attempt.
+
+    The pages before the failed page have been fetched, and the pagination can be continued from
+    the cursor of the last of them instead of from the start.
+
+    Attributes:
+        error (GraphQLQueryException): The error of the last attempt of the failed page.
+        cursor (str): The cursor of the last item fetched before the failure, or the cursor the pagination started after.
+        pages (int): The number of pages fetched before the failure.
+        partial_result (PaginationQueryResult): The items fetched before the failure, if they were accumulated.
+    """
+    def __init__(self, error: GraphQLQueryException, cursor: Optional[str], pages: int) -> None:
+        super().__init__(f"Pagination failed after {pages} pages: {error}")
+        self.error = error
+        self.cursor = cursor
+        self.pages = pages
+        self.partial_result = None
+
+
 class PaginationQueryResult:
     """
     Class to encapsulate the results of a paginated GraphQL query.
@@ -41,6 +114,78 @@ class PaginationQueryResult:
         return len(self.edges) > 0
 
 
+class _PaginationState:
+    """
+    The bookkeeping of one pagination, shared by the synchronous and asynchronous pagination loops.
+
+    Attributes:
+        variables (dict): The variables of the next page request.
+        page_size (AdaptivePageSize): The adaptive page size of the pagination, or None if the query has no 'first' variable.
+        last_cursor (str): The cursor of the last item fetched, or the cursor the pagination started after.
+        pages (int): The number of non-empty pages fetched.
+        has_next_page (bool): Whether there is a next page to fetch.
+    """
+    def __init__(self, variables: Dict[str, Any], page_size: Optional[AdaptivePageSize]) -> None:
+        self.variables = dict(variables)
+        self.page_size = page_size
+        self.last_cursor = self.variables.get('after')
+        self.pages = 0
+        self.has_next_page = True
+
+    def start_attempt(self) -> float:
+        """
+        Sets the 'first' variable to the current page size before an attempt of a page.
+
+        :return: The start time of the attempt.
+        """
+        if self.page_size:
+            self.variables['first'] = self.page_size.size
+        return time.monotonic()
+
+    def record_success(self, started: float) -> None:
+        """
+        Adapts the page size to the response time of a successful attempt.
+
+        :param started: The start time of the attempt.
+        """
+        if self.page_size:
+            self.page_size.record_success(time.monotonic() - started)
+
+    def next_page(self, result: Dict[str, Any]) -> Optional[PaginationQueryResult]:
+        """
+        Extracts the page from the result of a page request and moves the cursor past it.
+
+        :param result: The result of the query.
+        :return: The page, or None if it has no edges.
+        :raises GraphQLQueryException: If no data is found in the result.
+        """
+        query_name = next(iter(result))
+        data = result.get(query_name)
+        if not data:
+            raise GraphQLQueryException(f"No data found for query: {query_name}")
+
+        edges = data.get('edges')
+        self.has_next_page = data['pageInfo']['hasNextPage']
+        if not edges:
+            return None
+        self.last_cursor = edges[-1]['cursor']
+        self.variables['after'] = self.last_cursor
+        self.pages += 1
+        return PaginationQueryResult(edges=edges)
+
+    def error(self, error: Exception) -> GraphQLPaginationException:
+        """
+        Wraps the error of a failed page in a GraphQLPaginationException with the progress of the pagination.
+
+        :param error: The error of the last attempt of the page.
+        :return: The exception to raise.
+        """
+        if not isinstance(error, GraphQLQueryException):
+            logging.error(f"An error occurred during the GraphQL query execution: {error}")
+            error = GraphQLQueryException(f"An error occurred during the GraphQL query execution: {error}")
+        return GraphQLPaginationException(error, self.last_cursor, self.pages)
+
+
 class GraphQLClient:
     """
     A client to interact with a GraphQL API.
@@ -49,18 +194,63 @@ class GraphQLClient:
         api_endpoint (str): The endpoint URL of the GraphQL API.
         api_key (str): The API key for authentication.
         client (Client): The gql Client instance for executing queries.
+        schema_cache (SchemaCache): The local cache of the API schema, or None to introspect the API on creation.
+        validate_schema (bool): Whether queries are validated against the schema before they are sent.
+        rate_limiter (TokenBucket): The limiter every request takes a token from, or None for no client-side limit.
+        min_page_size (int): The smallest page size paginated queries are reduced to.
+        max_page_size (int): The largest page size of paginated queries.
+        page_target_seconds (float): The response time the page size of paginated queries is adapted to.
+        max_page_attempts (int): The number of times a page that timed out or was throttled is requested.
+
+    Paginated queries adapt their page size to the API: the 'first' variable of the query is the largest
+    page size, the page size is halved when a page times out or is throttled and the same page is requested
+    again, and it is scaled towards page_target_seconds after every page. The page size learned for a query is
+    reused by later paginations of the same query. When the API sends a Retry-After hint, the shared rate
+    limiter is paused, so every entity using it backs off.
+
+    The asynchronous API (execute_async, iter_pages_async, paginate_async) runs on a persistent
+    session that is opened with 'async with client:'. Several queries can be in flight on the
+    same session at once, and the connection is only set up once per session.
     """
 
-    def __init__(self, api_endpoint: str, api_key: str):
+    def __init__(self,
+                 api_endpoint: str,
+                 api_key: str,
+                 schema_path: str = None,
+                 schema_ttl: int = 86400,
+                 validate_schema: bool = True,
+                 rate_limiter: TokenBucket = None,
+                 min_page_size: int = 100,
+                 max_page_size: int = 10000,
+                 page_target_seconds: float = 15.0,
+                 max_page_attempts: int = 6):
         """
         Initializes the GraphQLClient with the given API endpoint and API key.
 
         :param api_endpoint: The endpoint URL of the GraphQL API.
         :param api_key: The API key for authentication.
+        :param schema_path: Path of a local SDL file caching the schema. If not set, the schema is introspected from the API.
+        :param schema_ttl: Number of seconds after which the cached schema is refreshed from the API.
+        :param validate_schema: If False, no schema is loaded and queries are not validated locally.
+        :param rate_limiter: A rate limiter, shared by all clients, that every request takes a token from.
+        :param min_page_size: The smallest page size paginated queries are reduced to.
+        :param max_page_size: The largest page size of paginated queries.
+        :param page_target_seconds: The response time the page size of paginated queries is adapted to.
+        :param max_page_attempts: The number of times a page that timed out or was throttled is requested.
         """
         self.api_endpoint = api_endpoint
         self.api_key = api_key
+        self.schema_cache = SchemaCache(schema_path, schema_ttl) if schema_path else None
+        self.validate_schema = validate_schema
+        self.rate_limiter = rate_limiter
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.page_target_seconds = page_target_seconds
+        self.max_page_attempts = max_page_attempts
         self.client = self._create_client()
+        self._page_sizes = {}
+        self._session = None
+        self._session_depth = 0
 
     def _create_client(self) -> Client:
         """
@@ -70,9 +260,34 @@ class GraphQLClient:
         """
         headers = {"Authorization": f"token {self.api_key}"}
         transport = AIOHTTPTransport(url=self.api_endpoint, headers=headers)
+        if not self.validate_schema:
+            return Client(transport=transport, fetch_schema_from_transport=False, execute_timeout=60)
+
+        schema = self._load_cached_schema() if self.schema_cache else None
+        if schema:
+            return Client(transport=transport, schema=schema, execute_timeout=60)
+
         return Client(transport=transport, fetch_schema_from_transport=True, execute_timeout=60)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    def _load_cached_schema(self) -> str:
+        """
+        Loads the schema from the local cache, refreshing it from the API first if it is missing or stale.
+        A stale schema is still used if the refresh fails.
+
+        :return: The schema as SDL, or None if no schema could be loaded.
+        """
+        if self.schema_cache.is_stale():
+            try:
+                return refresh_schema_cache(self.api_endpoint, self.api_key, self.schema_cache)
+            except Exception as e:
+                logging.warning(f"Failed to refresh the cached GraphQL schema: {e}")
+
+        return self.schema_cache.read()
+
+    @retry(stop=stop_after_attempt(3),
+           wait=wait_exponential(multiplier=1, min=2, max=10),
+           retry=retry_if_not_exception_type(GraphQLValidationException),
+           reraise=True)
     def execute_graphql_query(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Executes a GraphQL query and returns the result.
@@ -82,56 +297,345 @@ class GraphQLClient:
         :return: A dictionary representing the query result.
         :raises GraphQLQueryException: If an error occurs during query execution.
         """
+        return self._execute_once(query, variables)
+
+    def _execute_once(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Executes a GraphQL query once, after taking a token from the rate limiter.
+
+        :param query: The GraphQL query string.
+        :param variables: A dictionary of variables to be passed with the query.
+        :return: A dictionary representing the query result.
+        :raises GraphQLQueryException: If an error occurs during query execution.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
         try:
             logging.debug(f"Executing GraphQL query: {query} with variables: {variables}")
             return self.client.execute(query, variable_values=variables)
         except Exception as e:
-            logging.error(f"An error occurred: {str(e)}")
-            raise GraphQLQueryException(f"An error occurred: {str(e)}")
+            raise self._classify_exception(e) from e
+
+    def iter_pages(self, query: str, variables: Dict[str, Any]) -> Iterator[PaginationQueryResult]:
+        """
+        Paginates over a GraphQL query and yields each page as soon as it arrives.
+
+        Only the current page is held in memory, so callers that process pages incrementally
+        are bounded by the page size rather than by the size of the whole dataset.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param variables: Initial variables for the query, typically includes 'first' and optionally 'after'.
+        :return: An iterator of PaginationQueryResult, one per non-empty page.
+        :raises GraphQLPaginationException: If a page fails after its last attempt or no data is found. The
+            exception has the cursor of the last page yielded, to continue the pagination from.
+        """
+        state = _PaginationState(variables, self._get_page_size(query, variables))
+        while state.has_next_page:
+            try:
+                # Execute the query. Only the failing page is retried, from the cursor of the last page.
+                page = state.next_page(self._execute_page(query, state))
+            except Exception as e:
+                raise state.error(e) from e
+
+            # Hand the current page to the caller before fetching the next one.
+            if page:
+                yield page
+
+    def _execute_page(self, query: str, state: _PaginationState) -> Dict[str, Any]:
+        """
+        Executes the query for one page with the current page size, retrying only this page on failure.
+        The page is retried with a smaller page size if it timed out or was throttled.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param state: The state of the pagination, with the variables of the page.
+        :return: A dictionary representing the query result.
+        :raises GraphQLQueryException: If the page still fails after the last attempt.
+        """
+        attempt = 0
+        while True:
+            started = state.start_attempt()
+            try:
+                result = self._execute_once(query, state.variables)
+            except GraphQLQueryException as e:
+                attempt += 1
+                time.sleep(self._page_retry_wait(e, state.page_size, attempt))
+                continue
+
+            state.record_success(started)
+            return result
+
+    def iter_nodes(self, query: str, variables: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Paginates over a GraphQL query and yields the nodes one at a time.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param variables: Initial variables for the query, typically includes 'first' and optionally 'after'.
+        :return: An iterator of nodes (data items).
+        :raises GraphQLQueryException: If the query execution fails or no data is found.
+        """
+        for page in self.iter_pages(query, variables):
+            yield from page.get_nodes()
 
     def paginate_gql_query(self, query: str, variables: Dict[str, Any]) -> PaginationQueryResult:
         """
         Fetches all data by paginating over a GraphQL query.
 
+        All pages are accumulated in memory. Prefer iter_pages when the pages can be processed
+        one at a time.
+
         :param query: The GraphQL query string that includes pagination.
         :param variables: Initial variables for the query, typically includes 'first' and optionally 'after'.
-        :param query_name: The name of the query to extract results from the response.
         :return: A PaginationQueryResult containing all fetched items and the last cursor.
-        :raises GraphQLQueryException: If the query execution fails or no data is found.
+        :raises GraphQLPaginationException: If a page fails after its last attempt or no data is found. The
+            items fetched before the failure are in its partial_result.
         """
         all_results = []
-        last_cursor = None
+        try:
+            for page in self.iter_pages(query, variables):
+                all_results.extend(page.edges)
+        except GraphQLPaginationException as e:
+            e.partial_result = PaginationQueryResult(edges=all_results)
+            raise
 
-        while True:
+        return PaginationQueryResult(edges=all_results)
+
+    @retry(stop=stop_after_attempt(3),
+           wait=wait_exponential(multiplier=1, min=2, max=10),
+           retry=retry_if_not_exception_type(GraphQLValidationException),
+           reraise=True)
+    async def execute_async(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Executes a GraphQL query on the open asynchronous session and returns the result.
+
+        :param query: The GraphQL query string.
+        :param variables: A dictionary of variables to be passed with the query.
+        :return: A dictionary representing the query result.
+        :raises GraphQLQueryException: If no session is open or an error occurs during query execution.
+        """
+        return await self._execute_once_async(query, variables)
+
+    async def _execute_once_async(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Executes a GraphQL query once on the open asynchronous session, after taking a token from the rate limiter.
+
+        :param query: The GraphQL query string.
+        :param variables: A dictionary of variables to be passed with the query.
+        :return: A dictionary representing the query result.
+        :raises GraphQLQueryException: If no session is open or an error occurs during query execution.
+        """
+        if self._session is None:
+            raise GraphQLQueryException("No open session. Use 'async with client:' before executing queries asynchronously.")
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async()
+        try:
+            logging.debug(f"Executing GraphQL query asynchronously: {query} with variables: {variables}")
+            return await self._session.execute(query, variable_values=variables)
+        except Exception as e:
+            raise self._classify_exception(e) from e
+
+    async def iter_pages_async(self, query: str, variables: Dict[str, Any]) -> AsyncIterator[PaginationQueryResult]:
+        """
+        Asynchronously paginates over a GraphQL query and yields each page as soon as it arrives.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param variables: Initial variables for the query, typically includes 'first' and optionally 'after'.
+        :return: An asynchronous iterator of PaginationQueryResult, one per non-empty page.
+        :raises GraphQLPaginationException: If a page fails after its last attempt or no data is found. The
+            exception has the cursor of the last page yielded, to continue the pagination from.
+        """
+        state = _PaginationState(variables, self._get_page_size(query, variables))
+        while state.has_next_page:
             try:
-                # Execute the query.
-                result = self.execute_graphql_query(query=query, variables=variables)
-                query_name = next(iter(result))
-                data = result.get(query_name)
-                if not data:
-                    raise GraphQLQueryException(f"No data found for query: {query_name}")
-
-                # Extract the edges and last cursor form current page.
-                edges = data.get('edges')
-                if edges:
-                    all_results.extend(data['edges'])
-                    last_cursor = data['edges'][-1]['cursor']
-
-                # Check if there is a next page.
-                if not data['pageInfo']['hasNextPage']:
-                    break
-
-                # Update variables for the next page.
-                variables['after'] = last_cursor
-
-            except GraphQLQueryException:
-                raise
+                # Execute the query. Only the failing page is retried, from the cursor of the last page.
+                page = state.next_page(await self._execute_page_async(query, state))
             except Exception as e:
-                logging.error(f"An error occurred during the GraphQL query execution: {e}")
-                raise GraphQLQueryException(f"An error occurred during the GraphQL query execution: {e}")
+                raise state.error(e) from e
+
+            # Hand the current page to the caller before fetching the next one.
+            if page:
+                yield page
+
+    async def _execute_page_async(self, query: str, state: _PaginationState) -> Dict[str, Any]:
+        """
+        Asynchronously executes the query for one page with the current page size, retrying only this page on
+        failure. The page is retried with a smaller page size if it timed out or was throttled.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param state: The state of the pagination, with the variables of the page.
+        :return: A dictionary representing the query result.
+        :raises GraphQLQueryException: If the page still fails after the last attempt.
+        """
+        attempt = 0
+        while True:
+            started = state.start_attempt()
+            try:
+                result = await self._execute_once_async(query, state.variables)
+            except GraphQLQueryException as e:
+                attempt += 1
+                await asyncio.sleep(self._page_retry_wait(e, state.page_size, attempt))
+                continue
+
+            state.record_success(started)
+            return result
+
+    async def paginate_async(self, query: str, variables: Dict[str, Any]) -> PaginationQueryResult:
+        """
+        Asynchronously fetches all data by paginating over a GraphQL query.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param variables: Initial variables for the query, typically includes 'first' and optionally 'after'.
+        :return: A PaginationQueryResult containing all fetched items and the last cursor.
+        :raises GraphQLPaginationException: If a page fails after its last attempt or no data is found. The
+            items fetched before the failure are in its partial_result.
+        """
+        all_results = []
+        try:
+            async for page in self.iter_pages_async(query, variables):
+                all_results.extend(page.edges)
+        except GraphQLPaginationException as e:
+            e.partial_result = PaginationQueryResult(edges=all_results)
+            raise
 
         return PaginationQueryResult(edges=all_results)
 
+    def _get_page_size(self, query: str, variables: Dict[str, Any]) -> Optional[AdaptivePageSize]:
+        """
+        Gets the adaptive page size of a paginated query. The requested page size is the largest page size,
+        and the page size learned by earlier paginations of the same query is reused.
+
+        :param query: The GraphQL query string that includes pagination.
+        :param variables: Initial variables for the query.
+        :return: The adaptive page size, or None if the query has no 'first' variable.
+        """
+        first = variables.get('first')
+        if not first:
+            return None
+
+        key = (query, first)
+        page_size = self._page_sizes.get(key)
+        if page_size is None:
+            page_size = AdaptivePageSize(first, self.min_page_size, min(first, self.max_page_size), self.page_target_seconds)
+            self._page_sizes[key] = page_size
+        return page_size
+
+    def _page_retry_wait(self, error: GraphQLQueryException, page_size: Optional[AdaptivePageSize], attempt: int) -> float:
+        """
+        Decides whether a failed page is requested again and how long to wait before it is, by the kind of failure:
+        - queries rejected by the schema or the API are not retried,
+        - pages that timed out or were throttled are retried max_page_attempts times with half the page size,
+          after the Retry-After hint of the API if it sent one,
+        - network and server errors are retried NETWORK_ATTEMPTS times with exponential backoff,
+        - other errors are retried QUERY_ATTEMPTS times with exponential backoff.
+
+        :param error: The error of the failed attempt.
+        :param page_size: The adaptive page size of the pagination, or None if the query has no 'first' variable.
+        :param attempt: The number of failed attempts of the page so far.
+        :return: The number of seconds to wait before the next attempt.
+        :raises GraphQLQueryException: The error, if the page should not be requested again.
+        """
+        if isinstance(error, GraphQLValidationException):
+            raise error
+        if isinstance(error, (GraphQLTimeoutException, GraphQLThrottledException)):
+            if page_size:
+                page_size.record_failure()
+            if attempt >= self.max_page_attempts:
+                raise error
+            logging.warning(f"Page attempt {attempt} failed ({error}), retrying with page size "
+                            f"{page_size.size if page_size else 'unchanged'}.")
+            if isinstance(error, GraphQLThrottledException) and error.retry_after:
+                # A shared rate limiter has been paused for the hinted time and waits by itself.
+                return 0.0 if self.rate_limiter else error.retry_after
+        elif isinstance(error, GraphQLNetworkException):
+            if attempt >= NETWORK_ATTEMPTS:
+                raise error
+            logging.warning(f"Page attempt {attempt} failed with a network error ({error}), retrying.")
+            return min(2.0 ** attempt, 30.0)
+        elif attempt >= QUERY_ATTEMPTS:
+            raise error
+        return min(2.0 ** attempt, 10.0)
+
+    def _classify_exception(self, error: Exception) -> GraphQLQueryException:
+        """
+        Wraps an error of a query execution in the GraphQLQueryException for its kind of failure.
+        If the API throttled the query and sent a Retry-After hint, the rate limiter is paused for it.
+
+        :param error: The error raised by the gql client.
+        :return: A GraphQLTimeoutException, GraphQLThrottledException, GraphQLNetworkException,
+            GraphQLValidationException or, for any other error, a GraphQLQueryException.
+        """
+        message = f"An error occurred: {str(error) or type(error).__name__}"
+        logging.error(message)
+
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            return GraphQLTimeoutException(message)
+
+        throttled = isinstance(error, TransportServerError) and error.code in THROTTLING_STATUS_CODES
+        throttled = throttled or (isinstance(error, TransportQueryError) and THROTTLING_MESSAGE_PATTERN.search(str(error)))
+        if throttled:
+            retry_after = self._get_retry_after()
+            if retry_after and self.rate_limiter:
+                self.rate_limiter.pause(retry_after)
+            return GraphQLThrottledException(message, retry_after)
+
+        if self._is_validation_error(error):
+            return GraphQLValidationException(message)
+
+        if isinstance(error, (ClientError, ConnectionError, TransportServerError, TransportClosed, TransportProtocolError)):
+            return GraphQLNetworkException(message)
+
+        return GraphQLQueryException(message)
+
+    @staticmethod
+    def _is_validation_error(error: Exception) -> bool:
+        """
+        Checks whether an error is a rejection of an invalid query, which fails the same way when retried.
+
+        :param error: The error raised by the gql client.
+        :return: True for an error of the local schema validation, or an error of the API with a validation
+            error code or message. False for any other error, including other errors returned by the API.
+        """
+        if isinstance(error, GraphQLError):
+            return True
+        if not isinstance(error, TransportQueryError):
+            return False
+
+        for query_error in error.errors or [{"message": str(error)}]:
+            if not isinstance(query_error, dict):
+                continue
+            code = (query_error.get("extensions") or {}).get("code")
+            if code in VALIDATION_ERROR_CODES or VALIDATION_MESSAGE_PATTERN.search(query_error.get("message") or ""):
+                return True
+        return False
+
+    def _get_retry_after(self) -> Optional[float]:
+        """
+        Gets the Retry-After hint of the last response of the transport.
+
+        :return: The number of seconds to wait, or None if the response had no valid Retry-After header.
+        """
+        headers = getattr(self.client.transport, "response_headers", None) or {}
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    async def __aenter__(self):
+        """
+        Open a persistent asynchronous session. Nested 'async with' blocks share the outermost session.
+        """
+        if self._session_depth == 0:
+            self._session = await self.client.connect_async()
+        self._session_depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Close the asynchronous session when the outermost 'async with' block exits."""
+        self._session_depth -= 1
+        if self._session_depth == 0:
+            self._session = None
+            await self.client.close_async()
+
     def __enter__(self):
         """Enable use of 'with' statement."""
         return self
@@ -0,0 +1,117 @@
+import os
+import time
+import logging
+import asyncio
+from typing import Optional
+from graphql import print_schema
+from gql import Client
+from gql.transport.aiohttp import AIOHTTPTransport
+
+
+class SchemaCache:
+    """
+    A local file cache for the GraphQL schema of the API, stored as SDL.
+
+    Loading the schema from the cache avoids running a full introspection query against the API
+    every time a client is created. The cache is considered stale once it is older than the TTL.
+
+    Attributes:
+        path (str): The path of the SDL file.
+        ttl_seconds (int): The number of seconds after which the cached schema is considered stale.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 86400):
+        """
+        Initializes the SchemaCache.
+
+        :param path: The path of the SDL file.
+        :param ttl_seconds: The number of seconds after which the cached schema is considered stale.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+
+    def read(self) -> Optional[str]:
+        """
+        Reads the cached schema.
+
+        :return: The schema as SDL, or None if the cache file does not exist.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, sdl: str) -> None:
+        """
+        Writes the schema to the cache. The file is replaced atomically, so concurrent readers
+        never see a partially written schema.
+
+        :param sdl: The schema as SDL.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(sdl)
+        os.replace(tmp_path, self.path)
+        logging.info(f"GraphQL schema cached to '{self.path}'.")
+
+    def is_stale(self) -> bool:
+        """
+        Checks whether the cached schema is missing or older than the TTL.
+
+        :return: True if the schema should be refreshed, False otherwise.
+        """
+        try:
+            age = time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return True
+        return age > self.ttl_seconds
+
+
+def fetch_schema_sdl(api_endpoint: str, api_key: str) -> str:
+    """
+    Fetches the schema of the API with an introspection query.
+
+    :param api_endpoint: The endpoint URL of the GraphQL API.
+    :param api_key: The API key for authentication.
+    :return: The schema as SDL.
+    """
+    async def fetch() -> str:
+        headers = {"Authorization": f"token {api_key}"}
+        transport = AIOHTTPTransport(url=api_endpoint, headers=headers)
+        client = Client(transport=transport, fetch_schema_from_transport=True, execute_timeout=60)
+        async with client:
+            pass
+        return print_schema(client.schema)
+
+    return asyncio.run(fetch())
+
+
+def refresh_schema_cache(api_endpoint: str, api_key: str, cache: SchemaCache) -> str:
+    """
+    Fetches the schema of the API and writes it to the cache.
+
+    :param api_endpoint: The endpoint URL of the GraphQL API.
+    :param api_key: The API key for authentication.
+    :param cache: The cache to write the schema to.
+    :return: The schema as SDL.
+    """
+    sdl = fetch_schema_sdl(api_endpoint, api_key)
+    cache.write(sdl)
+    return sdl
+
+
+if __name__ == "__main__":
+    # Refresh the cached schema: python -m shared.gql_schema
+    from shared.environment_config import EnvironmentConfig
+
+    logging.basicConfig(level=logging.INFO)
+    config = EnvironmentConfig()
+    refresh_schema_cache(
+        config.api_endpoint,
+        config.api_key,
+        SchemaCache(config.graphql_schema_path, config.graphql_schema_ttl),
+    )
@@ -1,6 +1,7 @@
 from shared.gql_client import GraphQLClient, PaginationQueryResult
 from shared.utils.data_transformation import add_key_value_to_dicts
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, Optional
+import asyncio
 import logging
 
 
@@ -10,16 +11,16 @@ class ItemsResult:
 
     Attributes:
     items (list[Dict]): A list of items retrieved from the GraphQL query.
-    cursor (str): The cursor for the last processed item.
+    cursor (Optional[str]): The cursor for the last processed item, or None if the items were not fetched by cursor.
     """
 
-    def __init__(self, items: List[Dict], cursor: str) -> None:
+    def __init__(self, items: List[Dict], cursor: Optional[str]) -> None:
         """
         Initialize a new instance of ItemsResult.
 
         Args:
         items (list[Dict]): A list of items retrieved from the GraphQL query.
-        cursor (str): The cursor for the last processed item.
+        cursor (Optional[str]): The cursor for the last processed item, or None if the items were not fetched by cursor.
         """
         self.items = items
         self.cursor = cursor
@@ -42,12 +43,12 @@ class ItemsResult:
         """
         return self.items
     
-    def get_last_item_cursor(self) -> str:
+    def get_last_item_cursor(self) -> Optional[str]:
         """
         Get the cursor for the last item.
 
         Returns:
-        str: The cursor for the last item.
+        Optional[str]: The cursor for the last item, or None if the items were not fetched by cursor.
         """
         return self.cursor
     
@@ -70,9 +71,16 @@ class ItemFetcher:
     graphql_client (GraphQLClient): The GraphQL client used to execute queries.
     query_by_dbids (str): The GraphQL query to execute by database IDs.
     query_by_cursor (str): The GraphQL query to execute by cursor.
+    id_chunk_size (int): The maximum number of dbIds sent in a single query.
+    max_concurrency (int): The maximum number of dbId chunks fetched concurrently.
     """
 
-    def __init__(self, client: GraphQLClient, query_by_dbids: str, query_by_cursor: str) -> None:
+    def __init__(self,
+                 client: GraphQLClient,
+                 query_by_dbids: str,
+                 query_by_cursor: str,
+                 id_chunk_size: int = 1000,
+                 max_concurrency: int = 4) -> None:
         """
         Initialize a new instance of ItemFetcher.
 
@@ -80,29 +88,105 @@ class ItemFetcher:
         client (GraphQLClient): The GraphQL client used to execute queries.
         query_by_dbids (str): The GraphQL query to execute by database IDs.
         query_by_cursor (str): The GraphQL query to execute by cursor.
+        id_chunk_size (int): The maximum number of dbIds sent in a single query. Defaults to 1000.
+        max_concurrency (int): The maximum number of dbId chunks fetched concurrently. Defaults to 4.
         """
         self.graphql_client = client
         self.query_by_dbids = query_by_dbids
         self.query_by_cursor = query_by_cursor
+        self.id_chunk_size = id_chunk_size
+        self.max_concurrency = max_concurrency
 
     def fetch_items_by_ids(self, db_ids: List[str], first: int = 10000) -> ItemsResult:
         """
-        Fetch items by their dbIds.
+        Fetch items by their dbIds. The dbIds are split into chunks of at most id_chunk_size,
+        which are fetched concurrently.
 
         Args:
         db_ids (list[str]): A list of dbIds to fetch.
         first (int): The maximum number of items to fetch in each batch. Defaults to 10000.
 
         Returns:
-        ItemsResult: The result of the fetched items.
+        ItemsResult: The result of the fetched items, without a cursor.
         """
         if not db_ids:
             return ItemsResult([], None)
-        
-        variables = {"first": first, "dbIdList": db_ids}
-        query_result = self._execute_paginated_query(self.query_by_dbids, variables)
 
-        return ItemsResult(query_result.get_nodes(), query_result.get_last_cursor())
+        return asyncio.run(self.fetch_items_by_ids_async(db_ids, first))
+
+    async def fetch_items_by_ids_async(self,
+                                       db_ids: List[str],
+                                       first: int = 10000,
+                                       semaphore: Optional[asyncio.Semaphore] = None) -> ItemsResult:
+        """
+        Asynchronously fetch items by their dbIds. The dbIds are split into chunks of at most
+        id_chunk_size, which are fetched concurrently on a single session. The results are merged
+        in the order of the chunks.
+
+        Args:
+        db_ids (list[str]): A list of dbIds to fetch.
+        first (int): The maximum number of items to fetch in each batch. Defaults to 10000.
+        semaphore (Optional[asyncio.Semaphore]): Bounds the number of chunks in flight. Pass a shared
+            semaphore to bound several concurrent fetches together. Defaults to one allowing max_concurrency chunks.
+
+        Returns:
+        ItemsResult: The result of the fetched items, without a cursor, since the chunks are fetched concurrently
+            and no cursor covers all of them.
+        """
+        if not db_ids:
+            return ItemsResult([], None)
+
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_chunk(chunk: List[str]) -> PaginationQueryResult:
+            async with semaphore:
+                variables = {"first": first, "dbIdList": chunk}
+                return await self.graphql_client.paginate_async(self.query_by_dbids, variables)
+
+        try:
+            async with self.graphql_client:
+                results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in self._chunk_ids(db_ids)))
+        except Exception as e:
+            logging.error(f"Error fetching items: {e}")
+            raise
+
+        items = [node for result in results for node in result.get_nodes()]
+        return ItemsResult(items, None)
+
+    def fetch_items_by_id_lists(self, id_lists: List[List[str]], first: int = 10000) -> List[ItemsResult]:
+        """
+        Fetch the items of several lists of dbIds concurrently, e.g. the additions and the updates of a
+        change synchronization. The chunks of all lists are fetched on a single session and share one
+        bound of max_concurrency chunks in flight, so the time taken is that of the slowest chunks rather
+        than the sum of the lists.
+
+        Args:
+        id_lists (list[list[str]]): The lists of dbIds to fetch.
+        first (int): The maximum number of items to fetch in each batch. Defaults to 10000.
+
+        Returns:
+        list[ItemsResult]: The result of each list of dbIds, in the order of the lists.
+        """
+        if not any(id_lists):
+            return [ItemsResult([], None) for _ in id_lists]
+
+        return asyncio.run(self.fetch_items_by_id_lists_async(id_lists, first))
+
+    async def fetch_items_by_id_lists_async(self, id_lists: List[List[str]], first: int = 10000) -> List[ItemsResult]:
+        """
+        Asynchronously fetch the items of several lists of dbIds concurrently, on a single session.
+
+        Args:
+        id_lists (list[list[str]]): The lists of dbIds to fetch.
+        first (int): The maximum number of items to fetch in each batch. Defaults to 10000.
+
+        Returns:
+        list[ItemsResult]: The result of each list of dbIds, in the order of the lists.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.graphql_client:
+            results = await asyncio.gather(*(self.fetch_items_by_ids_async(db_ids, first, semaphore) for db_ids in id_lists))
+        return list(results)
 
     def fetch_all_items_after_cursor(self, after: str = None, first: int = 10000) -> ItemsResult:
         """
@@ -119,6 +203,47 @@ class ItemFetcher:
         query_result = self._execute_paginated_query(self.query_by_cursor, variables)
         return ItemsResult(query_result.get_nodes(), query_result.get_last_cursor())
 
+    def iter_items_by_ids(self, db_ids: List[str], first: int = 10000) -> Iterator[ItemsResult]:
+        """
+        Fetch items by their dbIds, yielding one page of items at a time.
+
+        Args:
+        db_ids (list[str]): A list of dbIds to fetch.
+        first (int): The maximum number of items to fetch in each batch. Defaults to 10000.
+
+        Yields:
+        ItemsResult: The items of a single page and the cursor of the last item in that page.
+        """
+        for chunk in self._chunk_ids(db_ids):
+            variables = {"first": first, "dbIdList": chunk}
+            yield from self._iter_paginated_query(self.query_by_dbids, variables)
+
+    def iter_items_after_cursor(self, after: str = None, first: int = 10000) -> Iterator[ItemsResult]:
+        """
+        Fetch all items after a given cursor, yielding one page of items at a time.
+
+        Args:
+        after (str): The cursor to start fetching items after. Defaults to None.
+        first (int): The maximum number of items to fetch in each batch. Defaults to 10000.
+
+        Yields:
+        ItemsResult: The items of a single page and the cursor of the last item in that page.
+        """
+        variables = {"first": first, "after": after}
+        yield from self._iter_paginated_query(self.query_by_cursor, variables)
+
+    def _chunk_ids(self, db_ids: List[str]) -> List[List[str]]:
+        """
+        Split a list of dbIds into chunks of at most id_chunk_size.
+
+        Args:
+        db_ids (list[str]): A list of dbIds.
+
+        Returns:
+        list[list[str]]: The chunks of dbIds.
+        """
+        return [db_ids[i:i + self.id_chunk_size] for i in range(0, len(db_ids), self.id_chunk_size)]
+
     def _execute_paginated_query(self, query: str, variables: Dict[str, Any]) -> PaginationQueryResult:
         """
         Execute a paginated GraphQL query. The query will continue to fetch items in batches
@@ -138,4 +263,25 @@ class ItemFetcher:
             return self.graphql_client.paginate_gql_query(query, variables)
         except Exception as e:
             logging.error(f"Error fetching items: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _iter_paginated_query(self, query: str, variables: Dict[str, Any]) -> Iterator[ItemsResult]:
+        """
+        Execute a paginated GraphQL query and yield the items page by page.
+
+        Args:
+        query (str): The GraphQL query to execute.
+        variables (Dict[str, Any]): A dictionary of variables to pass to the GraphQL query.
+
+        Yields:
+        ItemsResult: The items of a single page.
+
+        Raises:
+        Exception: If an error occurs while fetching items.
+        """
+        try:
+            for page in self.graphql_client.iter_pages(query, variables):
+                yield ItemsResult(page.get_nodes(), page.get_last_cursor())
+        except Exception as e:
+            logging.error(f"Error fetching items: {e}")
+            raise
@@ -0,0 +1,256 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import pyarrow as pa
+from shared.data_lake_writer import DataLakeWriter
+from shared.partitioning import Partitioning, partition_table, partition_file_path
+from shared.utils.arrow import convert_nodes_to_arrow_table
+from shared.utils.files import ParquetOptions, convert_arrow_table_to_parquet
+from shared.utils.time import generate_iso_8601_timestamp
+
+
+class ParquetPartWriter:
+    """
+    Writes a stream of items to the data lake as a sequence of bounded-size Parquet part files.
+
+    Items are buffered until the part reaches its row or byte limit, after which the part is
+    encoded and written. After every part, a manifest file listing the parts written so far
+    (and the cursor of the last item in each part) is written next to the parts, and it is
+    marked complete once all items have been added. Memory usage is therefore bounded by the
+    size of one part, regardless of how many items are written in total. Each batch of items is
+    converted column by column to an Arrow table when it is added, or is added as an Arrow table
+    converted by the caller (e.g. on another thread), and the tables are combined when the part is written.
+
+    A writer can continue an interrupted run by passing in the parts of its manifest.
+
+    With a partitioning, each part is split into one file per partition, written to the partition
+    directory (e.g. year=2024/month=07/day=11/<base name>-part-00000.parquet). The manifest stays in
+    the directory of the entity and lists the files of each part relative to it.
+
+    The size in bytes of a part is only known after it has been encoded, so the byte limit is
+    enforced by estimating the number of bytes per row from the previously written part. When
+    a byte limit is set, the first part is flushed after the first batch of items to calibrate
+    the estimate.
+
+    Attributes:
+    data_lake_writer (DataLakeWriter): The instance used to write data to the data lake.
+    base_name (str): The base file name of the parts and the manifest, e.g. full_sync-<timestamp>-<name>.
+    columns (List[str]): The list of columns to include in the Parquet files.
+    max_rows (Optional[int]): The maximum number of rows per part, or None for no row limit.
+    max_bytes (Optional[int]): The approximate maximum number of bytes per part, or None for no byte limit.
+    parts (List[Dict]): The parts written so far, as listed in the manifest.
+    constant_columns (Dict[str, Any]): Values of columns that are the same for every row, e.g. the mutationType.
+    schema (Optional[pa.Schema]): The Arrow schema of the parts, or None to infer the column types from the items.
+    parquet_options (Optional[ParquetOptions]): The options for writing the Parquet parts.
+    partitioning (Optional[Partitioning]): The partitioned layout of the parts, or None for a flat layout.
+    sync_time (datetime): The start time of the run, used by partitionings by synchronization time.
+    """
+
+    def __init__(self,
+                 data_lake_writer: DataLakeWriter,
+                 base_name: str,
+                 columns: List[str],
+                 max_rows: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 parts: Optional[List[Dict[str, Any]]] = None,
+                 constant_columns: Optional[Dict[str, Any]] = None,
+                 schema: Optional[pa.Schema] = None,
+                 parquet_options: Optional[ParquetOptions] = None,
+                 partitioning: Optional[Partitioning] = None,
+                 sync_time: Optional[datetime] = None) -> None:
+        """
+        Initialize a new instance of ParquetPartWriter.
+
+        Args:
+        data_lake_writer (DataLakeWriter): The instance used to write data to the data lake.
+        base_name (str): The base file name of the parts and the manifest.
+        columns (List[str]): The list of columns to include in the Parquet files.
+        max_rows (Optional[int]): The maximum number of rows per part. Defaults to no limit.
+        max_bytes (Optional[int]): The approximate maximum number of bytes per part. Defaults to no limit.
+        parts (Optional[List[Dict[str, Any]]]): The parts already written by an interrupted run, to continue from.
+        constant_columns (Optional[Dict[str, Any]]): Values of columns that are the same for every row.
+        schema (Optional[pa.Schema]): The Arrow schema of the parts. Defaults to inferring the column types.
+        parquet_options (Optional[ParquetOptions]): The options for writing the Parquet parts. Defaults to the pyarrow defaults.
+        partitioning (Optional[Partitioning]): The partitioned layout of the parts. Defaults to a flat layout.
+        sync_time (Optional[datetime]): The start time of the run. Defaults to now; pass the original start time when resuming.
+        """
+        self.data_lake_writer = data_lake_writer
+        self.base_name = base_name
+        self.columns = columns
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.parts = list(parts or [])
+        self.constant_columns = constant_columns or {}
+        self.schema = schema
+        self.parquet_options = parquet_options
+        self.partitioning = partitioning
+        self.sync_time = sync_time or datetime.now()
+        self._buffer = []
+        self._buffer_rows = 0
+        self._buffer_cursor = None
+        self._bytes_per_row = None
+        if self.parts and self.parts[-1]["rows"]:
+            self._bytes_per_row = self.parts[-1]["bytes"] / self.parts[-1]["rows"]
+
+    @property
+    def total_rows(self) -> int:
+        """
+        Get the total number of rows added so far, including rows not yet written.
+
+        Returns:
+        int: The total number of rows.
+        """
+        return sum(part["rows"] for part in self.parts) + self._buffer_rows
+
+    @property
+    def last_cursor(self) -> Optional[str]:
+        """
+        Get the cursor of the last item that has been written to a part.
+
+        Returns:
+        Optional[str]: The cursor, or None if no part with a cursor has been written.
+        """
+        return self.parts[-1].get("cursor") if self.parts else None
+
+    def add_items(self, items: List[Dict[str, Any]], cursor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Add a batch of items. A part is written when the buffered items reach the part limits.
+
+        Args:
+        items (List[Dict[str, Any]]): The (nested) items to add.
+        cursor (Optional[str]): The cursor of the last item in the batch.
+
+        Returns:
+        Optional[Dict[str, Any]]: The manifest entry of the part if one was written, otherwise None.
+        """
+        return self.add_table(self.to_table(items), cursor)
+
+    def add_table(self, table: pa.Table, cursor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Add a batch of items converted to an Arrow table with to_table. A part is written when the
+        buffered items reach the part limits.
+
+        Args:
+        table (pa.Table): The items to add.
+        cursor (Optional[str]): The cursor of the last item in the batch.
+
+        Returns:
+        Optional[Dict[str, Any]]: The manifest entry of the part if one was written, otherwise None.
+        """
+        if table.num_rows:
+            self._buffer.append(table)
+            self._buffer_rows += table.num_rows
+        if cursor is not None:
+            self._buffer_cursor = cursor
+        if self._part_is_full():
+            return self.flush()
+        return None
+
+    def to_table(self, items: List[Dict[str, Any]]) -> pa.Table:
+        """
+        Convert a batch of (nested) items to an Arrow table with the columns of the parts.
+
+        Args:
+        items (List[Dict[str, Any]]): The (nested) items.
+
+        Returns:
+        pa.Table: The table.
+        """
+        return convert_nodes_to_arrow_table(items, self.columns, self.constant_columns, self.schema)
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """
+        Write the buffered items as a new part.
+
+        Returns:
+        Optional[Dict[str, Any]]: The manifest entry of the written part, or None if the buffer was empty.
+        """
+        if not self._buffer:
+            return None
+
+        file_name = f"{self.base_name}-part-{len(self.parts):05d}.parquet"
+        table = pa.concat_tables(self._buffer)
+
+        # Write one file per partition of the part.
+        files = []
+        size = 0
+        for partition, partition_rows in partition_table(self.partitioning, table, self.sync_time):
+            file_path = partition_file_path(partition, file_name)
+            parquet = convert_arrow_table_to_parquet(partition_rows, self.parquet_options)
+            size += parquet.getbuffer().nbytes
+            self.data_lake_writer.write_data(file_path, parquet)
+            files.append(file_path)
+
+        part = {"files": files, "rows": self._buffer_rows, "bytes": size, "cursor": self._buffer_cursor}
+        self.parts.append(part)
+        self._bytes_per_row = size / self._buffer_rows
+        self._buffer = []
+        self._buffer_rows = 0
+        self._buffer_cursor = None
+
+        logging.info(f"Wrote part {file_name} with {part['rows']} rows in {len(files)} files ({size} bytes).")
+        self._write_manifest(complete=False)
+        return part
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write any remaining buffered items and the manifest listing all parts.
+
+        Returns:
+        Dict[str, Any]: The manifest.
+        """
+        self.flush()
+        manifest = self._write_manifest(complete=True)
+        logging.info(f"Wrote manifest for {self.base_name} with {len(self.parts)} parts.")
+        return manifest
+
+    @staticmethod
+    def manifest_name(base_name: str) -> str:
+        """
+        Get the file name of the manifest for a run.
+
+        Args:
+        base_name (str): The base file name of the run.
+
+        Returns:
+        str: The file name of the manifest.
+        """
+        return f"{base_name}.manifest.json"
+
+    def _write_manifest(self, complete: bool) -> Dict[str, Any]:
+        """
+        Write the manifest listing the parts written so far.
+
+        Args:
+        complete (bool): True if all items have been written, False for an in-progress checkpoint.
+
+        Returns:
+        Dict[str, Any]: The manifest.
+        """
+        manifest = {
+            "name": self.base_name,
+            "created": generate_iso_8601_timestamp(),
+            "complete": complete,
+            "columns": self.columns,
+            "total_rows": self.total_rows,
+            "parts": self.parts,
+        }
+        self.data_lake_writer.write_data(self.manifest_name(self.base_name), json.dumps(manifest, indent=2))
+        return manifest
+
+    def _part_is_full(self) -> bool:
+        """
+        Check whether the buffered items have reached the row or byte limit of a part.
+
+        Returns:
+        bool: True if the buffered items should be written as a part, False otherwise.
+        """
+        rows = self._buffer_rows
+        if self.max_rows and rows >= self.max_rows:
+            return True
+        if self.max_bytes:
+            if self._bytes_per_row is None:
+                return True
+            return rows * self._bytes_per_row >= self.max_bytes
+        return False
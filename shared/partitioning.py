@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# The partition value of rows with a null partition column, as used by Hive and Spark.
+NULL_PARTITION_VALUE = "__HIVE_DEFAULT_PARTITION__"
+
+
+class Partitioning(ABC):
+    """
+    A Hive-style partitioned layout for the files of an entity.
+
+    A partitioning splits a table into the tables of its partitions, each with the path of its
+    partition directory relative to the directory of the entity, e.g. year=2024/month=07/day=11.
+    Readers that understand Hive-style paths (Spark, Synapse, DuckDB, pyarrow) can prune
+    partitions by their path, and listing a partition stays cheap as the number of files grows.
+    """
+
+    @abstractmethod
+    def partition(self, table: pa.Table, sync_time: datetime) -> List[Tuple[str, pa.Table]]:
+        """
+        Split a table into partitions.
+
+        Args:
+        table (pa.Table): The table to split.
+        sync_time (datetime): The start time of the synchronization that fetched the rows.
+
+        Returns:
+        List[Tuple[str, pa.Table]]: The relative path and the table of each non-empty partition.
+        """
+
+
+class SyncTimePartitioning(Partitioning):
+    """
+    Partitions files by the date of the synchronization that wrote them: year=YYYY/month=MM/day=DD.
+    """
+
+    def partition(self, table: pa.Table, sync_time: datetime) -> List[Tuple[str, pa.Table]]:
+        return [(f"year={sync_time:%Y}/month={sync_time:%m}/day={sync_time:%d}", table)]
+
+
+class ColumnPartitioning(Partitioning):
+    """
+    Partitions files by the value of a column, e.g. fiscalYear=2024 for the column period.fiscalYear.
+
+    Attributes:
+    column (str): The column to partition by.
+    name (str): The name of the partition key in the path.
+    """
+
+    def __init__(self, column: str, name: Optional[str] = None) -> None:
+        """
+        Initialize a new instance of ColumnPartitioning.
+
+        Args:
+        column (str): The column to partition by.
+        name (Optional[str]): The name of the partition key in the path. Defaults to the last part of the column path.
+        """
+        self.column = column
+        self.name = name or column.split(".")[-1]
+
+    def partition(self, table: pa.Table, sync_time: datetime) -> List[Tuple[str, pa.Table]]:
+        values = table.column(self.column)
+        partitions = []
+        for value in pc.unique(values).to_pylist():
+            if value is None:
+                partitions.append((f"{self.name}={NULL_PARTITION_VALUE}", table.filter(pc.is_null(values))))
+            else:
+                partitions.append((f"{self.name}={value}", table.filter(pc.equal(values, value))))
+        return sorted(partitions, key=lambda partition: partition[0])
+
+
+def partition_table(partitioning: Optional[Partitioning], table: pa.Table, sync_time: datetime) -> List[Tuple[str, pa.Table]]:
+    """
+    Split a table into partitions, or keep it whole if there is no partitioning.
+
+    Args:
+    partitioning (Optional[Partitioning]): The partitioning, or None for a flat layout.
+    table (pa.Table): The table to split.
+    sync_time (datetime): The start time of the synchronization that fetched the rows.
+
+    Returns:
+    List[Tuple[str, pa.Table]]: The relative path (empty for a flat layout) and the table of each partition.
+    """
+    if partitioning is None:
+        return [("", table)]
+    return partitioning.partition(table, sync_time)
+
+
+def partition_file_path(partition: str, file_name: str) -> str:
+    """
+    Get the path of a file in a partition, relative to the directory of the entity.
+
+    Args:
+    partition (str): The relative path of the partition, or an empty string for a flat layout.
+    file_name (str): The name of the file.
+
+    Returns:
+    str: The relative path of the file.
+    """
+    return f"{partition}/{file_name}" if partition else file_name
@@ -0,0 +1,173 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from azure.appconfiguration import AzureAppConfigurationClient
+from azure.identity import DefaultAzureCredential
+from azure.storage.blob import BlobServiceClient
+from azure.storage.filedatalake import DataLakeServiceClient
+
+from shared.configuration_manager import SynchronizerStateManager
+from shared.data_lake_writer import DataLakeWriter
+from shared.environment_config import EnvironmentConfig
+from shared.gql_client import GraphQLClient
+from shared.state_store import StateStore, AppConfigurationStateStore, JsonFileStateStore, BlobStateStore
+from shared.throttling import TokenBucket
+
+
+class ResourceRegistry:
+    """
+    A lazily initialised registry of the clients shared by all functions in a worker process.
+
+    Creating credentials and service clients is expensive: every new client performs its own
+    token acquisition and TLS handshakes. The registry creates each resource on first use and
+    reuses it for every later invocation, across all entity types.
+
+    The Azure SDK clients are thread-safe and shared by all threads. A gql client can only have
+    one open connection at a time, so each worker thread gets its own GraphQLClient, which is
+    reused by every invocation running on that thread. The orchestrator runs the entities on the
+    sync_executor, whose threads live as long as the worker process, so their clients (and the
+    page sizes the clients have learned) are reused by every run instead of being created again.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty registry. Resources are created on first access.
+        """
+        self._lock = threading.Lock()
+        self._resources = {}
+        self._thread_local = threading.local()
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Get a shared resource, creating it with the factory on first access.
+
+        :param name: The name of the resource.
+        :param factory: A callable creating the resource.
+        :return: The shared resource.
+        """
+        resource = self._resources.get(name)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(name)
+                if resource is None:
+                    logging.info(f"Creating shared resource '{name}'.")
+                    resource = factory()
+                    self._resources[name] = resource
+        return resource
+
+    @property
+    def config(self) -> EnvironmentConfig:
+        """The environment configuration."""
+        return self._get_or_create("config", EnvironmentConfig)
+
+    @property
+    def credential(self) -> DefaultAzureCredential:
+        """The Azure credential. Tokens are cached by the credential and reused until they expire."""
+        return self._get_or_create("credential", DefaultAzureCredential)
+
+    @property
+    def data_lake_service_client(self) -> DataLakeServiceClient:
+        """The Data Lake service client for the data storage account."""
+        return self._get_or_create("data_lake_service_client", lambda: DataLakeServiceClient(
+            account_url=f"https://{self.config.data_storage_account}.dfs.core.windows.net",
+            credential=self.credential
+        ))
+
+    @property
+    def app_config_client(self) -> AzureAppConfigurationClient:
+        """The App Configuration client for the synchronizer state."""
+        return self._get_or_create("app_config_client", lambda: AzureAppConfigurationClient(
+            self.config.app_config_endpoint,
+            self.credential
+        ))
+
+    @property
+    def state_store(self) -> StateStore:
+        """The store for the synchronizer state, selected by the STATE_BACKEND setting."""
+        return self._get_or_create("state_store", self._create_state_store)
+
+    def _create_state_store(self) -> StateStore:
+        """
+        Create the state store for the configured backend.
+
+        :return: The state store
+        """
+        config = self.config
+        if config.state_backend == "file":
+            return JsonFileStateStore(config.state_file_path)
+        if config.state_backend == "blob":
+            blob_service_client = BlobServiceClient(
+                account_url=f"https://{config.data_storage_account}.blob.core.windows.net",
+                credential=self.credential
+            )
+            container_client = blob_service_client.get_container_client(config.state_blob_container)
+            if not container_client.exists():
+                container_client.create_container()
+            return BlobStateStore(container_client)
+        return AppConfigurationStateStore(self.app_config_client)
+
+    @property
+    def rate_limiter(self) -> TokenBucket:
+        """The rate limiter shared by the GraphQL clients of all threads, so all entities are limited together."""
+        return self._get_or_create("rate_limiter", lambda: TokenBucket(
+            self.config.api_rate_limit,
+            self.config.api_rate_burst
+        ))
+
+    @property
+    def sync_executor(self) -> ThreadPoolExecutor:
+        """The thread pool the orchestrator runs the entity synchronizations on, kept for the life of the worker process."""
+        return self._get_or_create("sync_executor", lambda: ThreadPoolExecutor(
+            max_workers=max(1, self.config.sync_max_concurrency),
+            thread_name_prefix="sync"
+        ))
+
+    @property
+    def graphql_client(self) -> GraphQLClient:
+        """The GraphQL client of the current thread."""
+        client = getattr(self._thread_local, "graphql_client", None)
+        if client is None:
+            config = self.config
+            client = GraphQLClient(
+                config.api_endpoint,
+                config.api_key,
+                schema_path=config.graphql_schema_path,
+                schema_ttl=config.graphql_schema_ttl,
+                validate_schema=config.graphql_validate_schema,
+                rate_limiter=self.rate_limiter,
+                min_page_size=config.page_size_min,
+                max_page_size=config.page_size_max,
+                page_target_seconds=config.page_target_seconds,
+            )
+            self._thread_local.graphql_client = client
+        return client
+
+    def create_data_lake_writer(self, default_directory: str = None) -> DataLakeWriter:
+        """
+        Create a DataLakeWriter for the data storage container that uses the shared service client.
+
+        :param default_directory: Default directory name
+        :return: A DataLakeWriter
+        """
+        config = self.config
+        return DataLakeWriter(
+            config.data_storage_account,
+            self.credential,
+            config.data_storage_container,
+            default_directory,
+            service_client=self.data_lake_service_client,
+        )
+
+    def create_state_manager(self, prefix: str = '') -> SynchronizerStateManager:
+        """
+        Create a SynchronizerStateManager that uses the shared state store.
+
+        :param prefix: Optional prefix for filtering configuration keys.
+        :return: A SynchronizerStateManager
+        """
+        return SynchronizerStateManager(prefix=prefix, store=self.state_store)
+
+
+# The registry shared by all blueprints in the worker process.
+resources = ResourceRegistry()
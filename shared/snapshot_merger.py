@@ -0,0 +1,280 @@
+import io
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from shared.data_lake_writer import DataLakeWriter
+from shared.utils.files import ParquetOptions, convert_arrow_table_to_parquet
+from shared.utils.time import generate_iso_8601_timestamp
+
+
+# Directory of the snapshots, one subdirectory per entity, outside the directories of the synced files.
+SNAPSHOTS_DIRECTORY = "snapshots"
+
+# Directory of the pieces of the shards while a snapshot is rebuilt, inside the directory of the snapshot.
+REBUILD_DIRECTORY = "_rebuild"
+
+# Key of the snapshot state in the metadata of the Parquet files.
+SNAPSHOT_METADATA_KEY = b"xledger.snapshot"
+
+# Name of the column with the row numbers used to find the latest row of every dbId.
+_ROW_INDEX_COLUMN = "__row_index"
+
+
+class SnapshotMerger:
+    """
+    Maintains the current state of an entity as Parquet files with one row per dbId.
+
+    Readers of the full_sync and sync_changes files have to replay every file and apply the mutationType
+    of each row themselves. The snapshot is that replay done once: it is rebuilt from the files of every
+    completed full synchronization, and each change synchronization is merged into it. Rows that were added
+    or updated replace the row with the same dbId and deleted rows are removed. The snapshot has the columns
+    of the synchronizer without mutationType.
+
+    The snapshot is split into shards by the dbId modulo the number of shards, one file per shard at
+    snapshots/<name>/shard=<n>/snapshot-<name>.parquet, sorted by dbId. Only one shard is held in memory at
+    a time: a rebuild first splits every part file of the full synchronization into pieces per shard, then
+    combines the pieces of each shard, and a batch of changes only rewrites the shards of its dbIds. Every
+    shard is written, even when it is empty, with the atomic writes of the DataLakeWriter, so readers always
+    see complete shards. The metadata of each shard records the full synchronization it is based on, and the
+    synchronization time and idempotency key of the last batch of changes merged into it, so a change
+    synchronization that is retried after it was merged into some shards is not merged into them again.
+
+    Attributes:
+    data_lake_writer (DataLakeWriter): The instance used to read and write the files of the entity.
+    name (str): The name of the entity.
+    parquet_options (Optional[ParquetOptions]): The options for writing the snapshot.
+    key (str): The integer column identifying a row.
+    mutation_type_column (str): The column with the type of change of a row.
+    shards (int): The number of shards of the snapshot.
+    """
+
+    def __init__(self,
+                 data_lake_writer: DataLakeWriter,
+                 name: str,
+                 parquet_options: Optional[ParquetOptions] = None,
+                 key: str = "dbId",
+                 mutation_type_column: str = "mutationType",
+                 shards: int = 16) -> None:
+        """
+        Initialize a new instance of SnapshotMerger.
+
+        Args:
+        data_lake_writer (DataLakeWriter): The instance used to read and write the files of the entity.
+        name (str): The name of the entity.
+        parquet_options (Optional[ParquetOptions]): The options for writing the snapshot. Defaults to the pyarrow defaults.
+        key (str): The integer column identifying a row. Defaults to dbId.
+        mutation_type_column (str): The column with the type of change of a row. Defaults to mutationType.
+        shards (int): The number of shards of the snapshot. Changing it takes effect with the next full synchronization.
+        """
+        self.data_lake_writer = data_lake_writer
+        self.name = name
+        self.parquet_options = parquet_options
+        self.key = key
+        self.mutation_type_column = mutation_type_column
+        self.shards = max(1, shards)
+
+    @property
+    def directory(self) -> str:
+        """
+        Get the directory of the snapshot.
+
+        Returns:
+        str: The directory, relative to the file system.
+        """
+        return f"{SNAPSHOTS_DIRECTORY}/{self.name}"
+
+    def shard_file_name(self, shard: int) -> str:
+        """
+        Get the path of the file of a shard.
+
+        Args:
+        shard (int): The number of the shard.
+
+        Returns:
+        str: The path, relative to the directory of the snapshot.
+        """
+        return f"shard={shard}/snapshot-{self.name}.parquet"
+
+    def rebuild(self, run_name: str, files: List[str], sync_time: datetime) -> int:
+        """
+        Replace the snapshot with the items of a completed full synchronization.
+
+        Args:
+        run_name (str): The name of the full synchronization run.
+        files (List[str]): The paths of the files of the run, relative to the directory of the entity.
+        sync_time (datetime): The start time of the run.
+
+        Returns:
+        int: The number of rows in the snapshot.
+        """
+        # Split every part into pieces per shard, so the rows of a shard can be combined without reading every part.
+        pieces = defaultdict(list)
+        schema = None
+        for index, path in enumerate(files):
+            table = self._drop_mutation_type(pq.read_table(io.BytesIO(self.data_lake_writer.read_data(path))))
+            schema = table.schema
+            for shard, rows in self._split_shards(table):
+                piece = f"{REBUILD_DIRECTORY}/{run_name}/shard={shard}/part-{index:05d}.parquet"
+                self.data_lake_writer.write_data(piece, convert_arrow_table_to_parquet(rows, self.parquet_options),
+                                                 directory_name=self.directory)
+                pieces[shard].append(piece)
+        if schema is None:
+            logging.warning(f"No files to rebuild the snapshot of {self.name} from.")
+            return 0
+
+        rows = 0
+        state = {"base": run_name, "applied_through": sync_time.isoformat(), "shards": self.shards}
+        for shard in range(self.shards):
+            tables = [pq.read_table(io.BytesIO(self.data_lake_writer.read_data(piece, directory_name=self.directory)))
+                      for piece in pieces[shard]]
+            snapshot = self._latest_rows(pa.concat_tables(tables)) if tables else schema.empty_table()
+            self._write_shard(shard, snapshot, state)
+            rows += snapshot.num_rows
+            for piece in pieces[shard]:
+                self.data_lake_writer.delete_file(piece, directory_name=self.directory)
+
+        self._delete_stale_files()
+        logging.info(f"Rebuilt snapshot of {self.name} from {run_name} ({rows} rows in {self.shards} shards).")
+        return rows
+
+    def apply(self, changes: pa.Table, sync_time: datetime, batch_key: str) -> Optional[int]:
+        """
+        Merge a batch of changes into the shards of the snapshot with the changed dbIds.
+
+        Args:
+        changes (pa.Table): The changes, with the columns of the synchronizer including mutationType.
+        sync_time (datetime): The start time of the change synchronization.
+        batch_key (str): The idempotency key of the batch. A shard whose last merged batch has this key is skipped.
+
+        Returns:
+        Optional[int]: The number of shards the changes were merged into, or None if there is no snapshot to merge them into.
+        """
+        merged = 0
+        for shard, shard_changes in self._split_shards(changes):
+            snapshot, state = self._read_shard(shard)
+            if snapshot is None or state.get("shards") != self.shards:
+                logging.warning(f"No snapshot of {self.name} with {self.shards} shards exists; "
+                                f"it is created by the next full synchronization.")
+                return None
+            if state.get("last_batch") == batch_key:
+                logging.info(f"Changes of {self.name} of batch {batch_key} are already in shard {shard} of the snapshot.")
+                continue
+
+            state["applied_through"] = sync_time.isoformat()
+            state["last_batch"] = batch_key
+            self._write_shard(shard, self._merge(snapshot, shard_changes), state)
+            merged += 1
+
+        logging.info(f"Merged {changes.num_rows} changes into {merged} shards of the snapshot of {self.name}.")
+        return merged
+
+    def _merge(self, snapshot: pa.Table, changes: pa.Table) -> pa.Table:
+        """
+        Merge changes into the rows of a shard.
+
+        Args:
+        snapshot (pa.Table): The rows of the shard.
+        changes (pa.Table): The changes of the dbIds of the shard, including mutationType.
+
+        Returns:
+        pa.Table: The merged rows, sorted by dbId.
+        """
+        # Rows that were deleted are removed, even if they were also added or updated in the same batch.
+        keys = changes.column(self.key)
+        is_deleted = pc.equal(pc.cast(changes.column(self.mutation_type_column), pa.string()), "DELETED")
+        deleted = pc.unique(keys.filter(is_deleted))
+        upserts = changes.filter(pc.invert(pc.is_in(keys, value_set=deleted)))
+        upserts = self._latest_rows(self._drop_mutation_type(upserts))
+
+        # Replace the rows of every changed dbId with its latest version.
+        kept = snapshot.filter(pc.invert(pc.is_in(snapshot.column(self.key), value_set=pc.unique(keys))))
+        return pa.concat_tables([kept, upserts.select(kept.column_names).cast(kept.schema)]).sort_by(self.key)
+
+    def _split_shards(self, table: pa.Table) -> List[Tuple[int, pa.Table]]:
+        """
+        Split the rows of a table by the shard of their dbId.
+
+        Args:
+        table (pa.Table): The rows.
+
+        Returns:
+        List[Tuple[int, pa.Table]]: The number and rows of every shard with at least one row, in the order of the table.
+        """
+        keys = pc.abs(table.column(self.key))
+        shards = pc.subtract(keys, pc.multiply(pc.divide(keys, self.shards), self.shards))
+        return [(shard, table.filter(pc.equal(shards, shard)))
+                for shard in sorted(pc.unique(shards).to_pylist())]
+
+    def _read_shard(self, shard: int) -> Tuple[Optional[pa.Table], Dict[str, Any]]:
+        """
+        Read a shard of the snapshot and its state.
+
+        Args:
+        shard (int): The number of the shard.
+
+        Returns:
+        Tuple[Optional[pa.Table], Dict[str, Any]]: The rows and state of the shard, or None and an empty state if it does not exist.
+        """
+        data = self.data_lake_writer.read_data(self.shard_file_name(shard), directory_name=self.directory)
+        if data is None:
+            return None, {}
+        table = pq.read_table(io.BytesIO(data))
+        state = json.loads((table.schema.metadata or {})[SNAPSHOT_METADATA_KEY])
+        return table.replace_schema_metadata(None), state
+
+    def _write_shard(self, shard: int, table: pa.Table, state: Dict[str, Any]) -> None:
+        """
+        Write a shard of the snapshot with its state in the file metadata.
+
+        Args:
+        shard (int): The number of the shard.
+        table (pa.Table): The rows of the shard.
+        state (Dict[str, Any]): The state of the shard.
+        """
+        state = dict(state, updated=generate_iso_8601_timestamp(), rows=table.num_rows)
+        table = table.replace_schema_metadata({SNAPSHOT_METADATA_KEY: json.dumps(state)})
+        parquet = convert_arrow_table_to_parquet(table, self.parquet_options)
+        self.data_lake_writer.write_data(self.shard_file_name(shard), parquet, directory_name=self.directory)
+
+    def _delete_stale_files(self) -> None:
+        """
+        Delete the files of shards beyond the number of shards, e.g. after the number of shards was reduced.
+        """
+        current = {self.shard_file_name(shard) for shard in range(self.shards)}
+        for path in self.data_lake_writer.list_files(directory_name=self.directory):
+            if path not in current:
+                self.data_lake_writer.delete_file(path, directory_name=self.directory)
+
+    def _drop_mutation_type(self, table: pa.Table) -> pa.Table:
+        """
+        Remove the mutationType column, if any, from a table.
+
+        Args:
+        table (pa.Table): The table.
+
+        Returns:
+        pa.Table: The table without the mutationType column.
+        """
+        return table.select([column for column in table.column_names if column != self.mutation_type_column])
+
+    def _latest_rows(self, table: pa.Table) -> pa.Table:
+        """
+        Keep only the last row of every dbId, sorted by dbId.
+
+        Args:
+        table (pa.Table): The rows, in the order they were synchronized.
+
+        Returns:
+        pa.Table: The latest row of every dbId.
+        """
+        indexed = table.append_column(_ROW_INDEX_COLUMN, pa.array(np.arange(table.num_rows)))
+        last = indexed.group_by(self.key).aggregate([(_ROW_INDEX_COLUMN, "max")])
+        if last.num_rows < table.num_rows:
+            table = table.take(last.column(f"{_ROW_INDEX_COLUMN}_max"))
+        return table.sort_by(self.key)
@@ -0,0 +1,305 @@
+import os
+import json
+import uuid
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+from azure.appconfiguration import AzureAppConfigurationClient, ConfigurationSetting
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.storage.blob import ContainerClient
+
+
+# Key of the setting with the state document of a prefix in App Configuration, after the prefix.
+STATE_DOCUMENT_KEY = "state.json"
+
+
+class StateConflictError(Exception):
+    """Exception raised when state was modified by someone else since it was loaded."""
+    pass
+
+
+class StateEntry:
+    """
+    A single value in a state store, with the ETag used for optimistic concurrency.
+
+    Attributes:
+        value (str): The value.
+        etag (str): The version of the value in the store.
+    """
+
+    def __init__(self, value: str, etag: str) -> None:
+        self.value = value
+        self.etag = etag
+
+
+class StateStore(ABC):
+    """
+    A key-value store for the synchronizer state.
+
+    Keys are full keys, including any prefix. Writes are conditional: a change with an ETag is only
+    applied if the stored value still has that ETag, and a change without an ETag is only applied if
+    the key does not exist yet. Otherwise a StateConflictError is raised.
+    """
+
+    @abstractmethod
+    def load(self, prefix: str = '') -> Dict[str, StateEntry]:
+        """
+        Load all entries whose key starts with the prefix.
+
+        :param prefix: The key prefix.
+        :return: The entries by key.
+        """
+
+    @abstractmethod
+    def save(self, changes: Dict[str, Tuple[str, Optional[str]]], prefix: str = '') -> Dict[str, StateEntry]:
+        """
+        Save a set of changes. Either all changes are saved or none.
+
+        :param changes: The new value and the expected ETag (None for a new key) by key.
+        :param prefix: The prefix the keys were loaded with.
+        :return: The saved entries by key.
+        :raises StateConflictError: If a key was modified since its ETag was read.
+        """
+
+    @abstractmethod
+    def delete_all(self, prefix: str = '') -> None:
+        """
+        Delete all entries whose key starts with the prefix.
+
+        :param prefix: The key prefix.
+        """
+
+
+def _parse_document(data: Optional[bytes]) -> Dict[str, Dict[str, str]]:
+    """
+    Parse a JSON state document of the form {key: {"value": ..., "etag": ...}}.
+
+    :param data: The serialised document, or None for an empty document.
+    :return: The parsed document.
+    """
+    return json.loads(data) if data else {}
+
+
+def _document_entries(document: Dict[str, Dict[str, str]], prefix: str = '') -> Dict[str, StateEntry]:
+    """
+    Get the entries of a JSON state document whose key starts with the prefix.
+
+    :param document: The parsed document.
+    :param prefix: The key prefix.
+    :return: The entries by key.
+    """
+    return {key: StateEntry(entry["value"], entry["etag"])
+            for key, entry in document.items() if key.startswith(prefix)}
+
+
+def _apply_changes(document: Dict[str, Dict[str, str]],
+                   changes: Dict[str, Tuple[str, Optional[str]]]) -> Dict[str, StateEntry]:
+    """
+    Apply changes to a JSON state document in place, after checking the expected ETags.
+
+    :param document: The parsed document.
+    :param changes: The new value and the expected ETag (None for a new key) by key.
+    :return: The saved entries by key.
+    :raises StateConflictError: If a key was modified since its ETag was read.
+    """
+    for key, (_, etag) in changes.items():
+        current = document.get(key)
+        current_etag = current["etag"] if current else None
+        if current_etag != etag:
+            raise StateConflictError(f"State key '{key}' was modified by another run.")
+
+    saved = {}
+    for key, (value, _) in changes.items():
+        document[key] = {"value": value, "etag": uuid.uuid4().hex}
+        saved[key] = StateEntry(value, document[key]["etag"])
+    return saved
+
+
+class AppConfigurationStateStore(StateStore):
+    """
+    Stores the state in Azure App Configuration, as one JSON document setting per prefix.
+
+    A save writes the whole document of the prefix with a single request, conditional on the ETag of the
+    setting, so the changes of a commit are applied together or not at all. State saved by earlier versions
+    as one setting per key is read when a prefix has no document yet, and copied into the document on the
+    first save.
+    """
+
+    def __init__(self, client: AzureAppConfigurationClient) -> None:
+        """
+        Initialize the AppConfigurationStateStore.
+
+        :param client: The App Configuration client.
+        """
+        self._client = client
+
+    @staticmethod
+    def _document_key(prefix: str) -> str:
+        """
+        :param prefix: The key prefix.
+        :return: The key of the document setting of the prefix.
+        """
+        return f"{prefix}{STATE_DOCUMENT_KEY}"
+
+    def _read(self, prefix: str) -> Tuple[Dict[str, Dict[str, str]], Optional[str]]:
+        """
+        :param prefix: The key prefix.
+        :return: The parsed document of the prefix and the ETag of its setting, or the settings per key
+            and None if the prefix has no document yet.
+        """
+        try:
+            setting = self._client.get_configuration_setting(self._document_key(prefix))
+            return _parse_document(setting.value), setting.etag
+        except ResourceNotFoundError:
+            settings = self._client.list_configuration_settings(key_filter=f"{prefix}*")
+            return {setting.key: {"value": setting.value, "etag": setting.etag} for setting in settings
+                    if not setting.key.endswith(STATE_DOCUMENT_KEY)}, None
+
+    def load(self, prefix: str = '') -> Dict[str, StateEntry]:
+        document, _ = self._read(prefix)
+        return _document_entries(document, prefix)
+
+    def save(self, changes: Dict[str, Tuple[str, Optional[str]]], prefix: str = '') -> Dict[str, StateEntry]:
+        document, etag = self._read(prefix)
+        saved = _apply_changes(document, changes)
+        setting = ConfigurationSetting(key=self._document_key(prefix), value=json.dumps(document),
+                                       content_type="application/json", etag=etag)
+        try:
+            if etag is None:
+                # Only create the document if it still does not exist.
+                self._client.add_configuration_setting(setting)
+            else:
+                self._client.set_configuration_setting(setting, match_condition=MatchConditions.IfNotModified)
+        except (ResourceModifiedError, ResourceExistsError) as e:
+            raise StateConflictError(f"State was modified by another run: {e}")
+        return saved
+
+    def delete_all(self, prefix: str = '') -> None:
+        for setting in self._client.list_configuration_settings(key_filter=f"{prefix}*"):
+            self._client.delete_configuration_setting(setting.key)
+            logging.info(f"Deleted state: {setting.key}.")
+
+
+class JsonFileStateStore(StateStore):
+    """
+    Stores the state in a local JSON file. Intended for local development and offline load tests.
+    The file is replaced atomically on every save, and access is serialised within the process.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the JsonFileStateStore.
+
+        :param path: The path of the JSON file. Created on the first save.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        """
+        :return: The parsed document, or an empty document if the file does not exist.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                return _parse_document(f.read())
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, document: Dict[str, Dict[str, str]]) -> None:
+        """
+        :param document: The document to write.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def load(self, prefix: str = '') -> Dict[str, StateEntry]:
+        with self._lock:
+            return _document_entries(self._read(), prefix)
+
+    def save(self, changes: Dict[str, Tuple[str, Optional[str]]], prefix: str = '') -> Dict[str, StateEntry]:
+        with self._lock:
+            document = self._read()
+            saved = _apply_changes(document, changes)
+            self._write(document)
+            return saved
+
+    def delete_all(self, prefix: str = '') -> None:
+        with self._lock:
+            document = self._read()
+            self._write({key: entry for key, entry in document.items() if not key.startswith(prefix)})
+
+
+class BlobStateStore(StateStore):
+    """
+    Stores the state as one JSON blob in Azure Blob Storage. A save is a single conditional upload:
+    the blob is read, the changes are applied after checking the key ETags, and it is written back
+    only if the blob has not changed in the meantime. Concurrent saves of unrelated keys are retried.
+    """
+
+    def __init__(self, container_client: ContainerClient, blob_name: str = "state.json", max_attempts: int = 5) -> None:
+        """
+        Initialize the BlobStateStore.
+
+        :param container_client: The client of the container holding the state blob.
+        :param blob_name: The name of the state blob.
+        :param max_attempts: The number of attempts when the blob is modified concurrently.
+        """
+        self._container_client = container_client
+        self._blob_client = container_client.get_blob_client(blob_name)
+        self.max_attempts = max_attempts
+
+    def _read(self) -> Tuple[Dict[str, Dict[str, str]], Optional[str]]:
+        """
+        :return: The parsed document and the ETag of the blob, or None if the blob does not exist.
+        """
+        try:
+            downloader = self._blob_client.download_blob()
+            return _parse_document(downloader.readall()), downloader.properties.etag
+        except ResourceNotFoundError:
+            return {}, None
+
+    def _write(self, document: Dict[str, Dict[str, str]], etag: Optional[str]) -> None:
+        """
+        :param document: The document to write.
+        :param etag: The ETag the blob must still have, or None if the blob must not exist yet.
+        """
+        data = json.dumps(document, indent=2)
+        if etag is None:
+            # Only create the blob if it still does not exist.
+            self._blob_client.upload_blob(data, overwrite=False)
+        else:
+            self._blob_client.upload_blob(data, overwrite=True, etag=etag, match_condition=MatchConditions.IfNotModified)
+
+    def load(self, prefix: str = '') -> Dict[str, StateEntry]:
+        document, _ = self._read()
+        return _document_entries(document, prefix)
+
+    def save(self, changes: Dict[str, Tuple[str, Optional[str]]], prefix: str = '') -> Dict[str, StateEntry]:
+        for attempt in range(1, self.max_attempts + 1):
+            document, etag = self._read()
+            saved = _apply_changes(document, changes)
+            try:
+                self._write(document, etag)
+                return saved
+            except (ResourceModifiedError, ResourceExistsError) as e:
+                logging.info(f"State blob modified concurrently (attempt {attempt}/{self.max_attempts}): {e}")
+        raise StateConflictError(f"State blob was modified concurrently {self.max_attempts} times.")
+
+    def delete_all(self, prefix: str = '') -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            document, etag = self._read()
+            if etag is None:
+                return
+            try:
+                self._write({key: entry for key, entry in document.items() if not key.startswith(prefix)}, etag)
+                return
+            except ResourceModifiedError as e:
+                logging.info(f"State blob modified concurrently (attempt {attempt}/{self.max_attempts}): {e}")
+        raise StateConflictError(f"State blob was modified concurrently {self.max_attempts} times.")
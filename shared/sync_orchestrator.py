@@ -0,0 +1,144 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+
+class SyncJobResult:
+    """
+    The outcome of a single entity synchronization run by the SyncOrchestrator.
+
+    Attributes:
+    name (str): The name of the entity.
+    duration (float): The wall time of the synchronization in seconds.
+    error (Optional[Exception]): The exception raised by the synchronization, or None if it succeeded.
+    """
+
+    def __init__(self, name: str, duration: float, error: Optional[Exception] = None) -> None:
+        """
+        Initialize a new instance of SyncJobResult.
+
+        Args:
+        name (str): The name of the entity.
+        duration (float): The wall time of the synchronization in seconds.
+        error (Optional[Exception]): The exception raised by the synchronization, or None if it succeeded.
+        """
+        self.name = name
+        self.duration = duration
+        self.error = error
+
+    def succeeded(self) -> bool:
+        """
+        Check if the synchronization succeeded.
+
+        Returns:
+        bool: True if no exception was raised, False otherwise.
+        """
+        return self.error is None
+
+
+class SyncOrchestrator:
+    """
+    Runs the synchronization of several entities in one invocation, with bounded concurrency.
+
+    Entities are started in priority order, and at most max_concurrency of them run at the same time,
+    which smooths the load on the Xledger API and the storage account compared to starting every
+    entity at once. A failing entity does not stop the others; every entity is run and its duration
+    and outcome are reported.
+
+    The jobs run on a thread pool. A pool passed in as executor is kept for the life of the worker process,
+    so the worker threads, and the GraphQL clients and learned page sizes bound to them, are reused by every
+    run; without one, a pool is created for each run.
+
+    Attributes:
+    jobs (Dict[str, Callable[[], None]]): The synchronization function of each entity, in default order.
+    max_concurrency (int): The maximum number of entities synchronized at the same time.
+    priority (List[str]): Entities to start before the others, in this order.
+    executor (Optional[ThreadPoolExecutor]): The persistent thread pool the jobs run on, or None for a pool per run.
+    """
+
+    def __init__(self,
+                 jobs: Dict[str, Callable[[], None]],
+                 max_concurrency: int = 2,
+                 priority: Optional[List[str]] = None,
+                 executor: Optional[ThreadPoolExecutor] = None) -> None:
+        """
+        Initialize a new instance of SyncOrchestrator.
+
+        Args:
+        jobs (Dict[str, Callable[[], None]]): The synchronization function of each entity, in default order.
+        max_concurrency (int): The maximum number of entities synchronized at the same time. Defaults to 2.
+        priority (Optional[List[str]]): Entities to start before the others, in this order.
+        executor (Optional[ThreadPoolExecutor]): A persistent thread pool to run the jobs on, which is not shut down
+            after the run. Its number of workers bounds the concurrency. Defaults to a pool of max_concurrency threads per run.
+        """
+        self.jobs = jobs
+        self.max_concurrency = max(1, max_concurrency)
+        self.priority = priority or []
+        self.executor = executor
+
+        unknown = [name for name in self.priority if name not in self.jobs]
+        if unknown:
+            raise ValueError(f"Unknown entities in priority: {', '.join(unknown)}.")
+
+    def ordered_job_names(self) -> List[str]:
+        """
+        Get the names of the entities in the order they are started.
+
+        Returns:
+        List[str]: The prioritised entities followed by the remaining entities in default order.
+        """
+        return self.priority + [name for name in self.jobs if name not in self.priority]
+
+    def run(self) -> List[SyncJobResult]:
+        """
+        Synchronize all entities and log a summary of the durations.
+
+        Returns:
+        List[SyncJobResult]: The result of each entity, in the order they were started.
+        """
+        start = time.monotonic()
+        if self.executor is not None:
+            results = self._run_jobs(self.executor)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="sync") as executor:
+                results = self._run_jobs(executor)
+
+        for result in results:
+            status = "succeeded" if result.succeeded() else f"failed: {result.error}"
+            logging.info(f"Synchronization of {result.name} {status} in {result.duration:.1f}s.")
+        logging.info(f"Synchronized {len(results)} entities in {time.monotonic() - start:.1f}s.")
+
+        return results
+
+    def _run_jobs(self, executor: ThreadPoolExecutor) -> List[SyncJobResult]:
+        """
+        Run every job on a thread pool and wait for all of them.
+
+        Args:
+        executor (ThreadPoolExecutor): The thread pool.
+
+        Returns:
+        List[SyncJobResult]: The result of each entity, in the order they were started.
+        """
+        futures = [executor.submit(self._run_job, name) for name in self.ordered_job_names()]
+        return [future.result() for future in futures]
+
+    def _run_job(self, name: str) -> SyncJobResult:
+        """
+        Synchronize a single entity, capturing its duration and any exception.
+
+        Args:
+        name (str): The name of the entity.
+
+        Returns:
+        SyncJobResult: The result of the synchronization.
+        """
+        logging.info(f"Starting synchronization of {name}.")
+        start = time.monotonic()
+        try:
+            self.jobs[name]()
+            return SyncJobResult(name, time.monotonic() - start)
+        except Exception as e:
+            logging.exception(f"Synchronization of {name} failed: {e}")
+            return SyncJobResult(name, time.monotonic() - start, e)
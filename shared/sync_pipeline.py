@@ -0,0 +1,175 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List
+
+
+# Marks the end of the items of a stage.
+_END = object()
+
+
+class _Failure:
+    """
+    Carries an exception raised by a stage to the consumer of the pipeline, after the items produced before it.
+    """
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class SyncPipeline:
+    """
+    Runs the stages of a synchronization concurrently, connected by bounded queues.
+
+    The source (e.g. the pages fetched from the API) is iterated on its own thread, and each stage (e.g. the
+    conversion of a page to an Arrow table) runs on its own thread, taking the items of the previous stage from
+    a queue and putting its results on the next queue. The consumer iterating the pipeline (e.g. the writer of
+    the Parquet parts) gets the results of the last stage. While the consumer uploads a part, the next pages are
+    fetched and converted, so the wall time of a synchronization approaches that of its slowest stage instead of
+    the sum of all stages.
+
+    Every stage handles one item at a time, so the items reach the consumer in the order of the source. Each
+    queue holds at most queue_size items, which bounds the memory used by items in flight, and a stage that gets
+    ahead of the next one waits. An exception raised by the source or a stage is raised to the consumer after all
+    items produced before it, so the consumer can still process and checkpoint them. When the consumer stops
+    iterating, the threads of the stages are stopped.
+
+    Attributes:
+    source (Iterable[Any]): The items fed into the first stage.
+    stages (List[Callable[[Any], Any]]): The functions applied to each item, in order.
+    queue_size (int): The maximum number of items waiting in each queue.
+    name (str): The name of the pipeline, used for the names of its threads.
+    """
+
+    def __init__(self,
+                 source: Iterable[Any],
+                 stages: List[Callable[[Any], Any]],
+                 queue_size: int = 2,
+                 name: str = "sync") -> None:
+        """
+        Initialize a new instance of SyncPipeline.
+
+        Args:
+        source (Iterable[Any]): The items fed into the first stage.
+        stages (List[Callable[[Any], Any]]): The functions applied to each item, in order.
+        queue_size (int): The maximum number of items waiting in each queue. Defaults to 2.
+        name (str): The name of the pipeline, used for the names of its threads.
+        """
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.name = name
+        self._stopped = threading.Event()
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Start the stages and iterate over the results of the last stage.
+
+        Yields:
+        Any: The result of the last stage for each item of the source, in order.
+
+        Raises:
+        Exception: The first exception raised by the source or a stage, after the items produced before it.
+        """
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._run_source, args=(queues[0],), name=f"{self.name}-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.append(threading.Thread(target=self._run_stage,
+                                            args=(stage, queues[index], queues[index + 1]),
+                                            name=f"{self.name}-stage-{index}",
+                                            daemon=True))
+
+        self._stopped.clear()
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            # Stop the stages if the consumer stopped early or failed, and wait for them to exit.
+            self._stopped.set()
+            for thread in threads:
+                thread.join()
+
+    def _put(self, output: queue.Queue, item: Any) -> bool:
+        """
+        Put an item on a queue, waiting for space unless the pipeline is stopped.
+
+        Args:
+        output (queue.Queue): The queue.
+        item (Any): The item.
+
+        Returns:
+        bool: True if the item was put on the queue, False if the pipeline was stopped.
+        """
+        while not self._stopped.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, input: queue.Queue) -> Any:
+        """
+        Get an item from a queue, waiting for one unless the pipeline is stopped.
+
+        Args:
+        input (queue.Queue): The queue.
+
+        Returns:
+        Any: The item, or _END if the pipeline was stopped.
+        """
+        while not self._stopped.is_set():
+            try:
+                return input.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _run_source(self, output: queue.Queue) -> None:
+        """
+        Feed the items of the source into the first queue.
+
+        Args:
+        output (queue.Queue): The queue of the first stage.
+        """
+        try:
+            for item in self.source:
+                if not self._put(output, item):
+                    return
+        except BaseException as e:
+            logging.debug(f"Source of pipeline {self.name} failed: {e}")
+            self._put(output, _Failure(e))
+            return
+        self._put(output, _END)
+
+    def _run_stage(self, stage: Callable[[Any], Any], input: queue.Queue, output: queue.Queue) -> None:
+        """
+        Apply a stage to every item of its input queue and put the results on its output queue.
+        The end of the items and failures of earlier stages are passed on.
+
+        Args:
+        stage (Callable[[Any], Any]): The function of the stage.
+        input (queue.Queue): The queue of the previous stage.
+        output (queue.Queue): The queue of the next stage.
+        """
+        while True:
+            item = self._get(input)
+            if item is _END or isinstance(item, _Failure):
+                self._put(output, item)
+                return
+            try:
+                result = stage(item)
+            except BaseException as e:
+                logging.debug(f"Stage of pipeline {self.name} failed: {e}")
+                self._put(output, _Failure(e))
+                return
+            if not self._put(output, result):
+                return
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    A client-side rate limiter for the requests sent to an API.
+
+    The bucket holds up to capacity tokens and is refilled with rate tokens per second. Every request
+    takes one token and waits until one is available, so bursts of up to capacity requests are sent at
+    once and the sustained request rate never exceeds rate. The bucket is thread-safe and can be used from
+    synchronous and asynchronous code at the same time, so a single bucket shared by every client in the
+    worker process limits the requests of all entities together.
+
+    When the server asks the client to slow down (e.g. with a Retry-After header), pause stops every
+    request taking a token until the pause has passed.
+
+    Attributes:
+        rate (float): The number of tokens added per second, or 0 for no limit.
+        capacity (float): The maximum number of tokens in the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initializes a full bucket.
+
+        :param rate: The number of requests allowed per second, or 0 for no limit.
+        :param capacity: The maximum number of requests sent in a burst. Defaults to the rate (at least 1).
+        """
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes a token, borrowing it from the future if the bucket is empty.
+
+        :return: The number of seconds to wait before the token may be used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            pause = max(self._paused_until - now, 0.0)
+            if not self.rate:
+                return pause
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, pause)
+
+    def acquire(self) -> float:
+        """
+        Takes a token, blocking the thread until it is available.
+
+        :return: The number of seconds waited.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        Takes a token, suspending the task until it is available.
+
+        :return: The number of seconds waited.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for a number of seconds, e.g. as requested by a Retry-After header.
+
+        :param seconds: The number of seconds to pause for.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptivePageSize:
+    """
+    Adapts the page size of a paginated query to the response times of the API.
+
+    A page that takes longer than the target duration, times out or is throttled is a sign that the pages
+    are too large for the API at the moment, so the page size is halved after a failure and scaled down
+    after a slow response. Fast responses scale the page size up again, by at most a factor of two per page,
+    up to the maximum page size. After the first failure, the page size grows by at most a quarter per page,
+    so it approaches the size that failed slowly instead of failing again right away.
+
+    Attributes:
+        size (int): The current page size.
+        minimum (int): The smallest page size.
+        maximum (int): The largest page size.
+        target_seconds (float): The response time aimed for.
+    """
+
+    def __init__(self, initial: int, minimum: int = 100, maximum: int = 10000, target_seconds: float = 15.0):
+        """
+        Initializes the page size.
+
+        :param initial: The page size of the first page.
+        :param minimum: The smallest page size.
+        :param maximum: The largest page size.
+        :param target_seconds: The response time aimed for.
+        """
+        self.minimum = min(minimum, maximum)
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.size = self._clamp(initial)
+        self._max_growth = 2.0
+
+    def _clamp(self, size: float) -> int:
+        """
+        Limits a page size to the minimum and maximum.
+
+        :param size: The page size.
+        :return: The limited page size.
+        """
+        return int(max(self.minimum, min(self.maximum, size)))
+
+    def record_success(self, seconds: float) -> int:
+        """
+        Adapts the page size to the response time of a page.
+
+        :param seconds: The response time of the page.
+        :return: The page size of the next page.
+        """
+        factor = self.target_seconds / seconds if seconds > 0 else 2.0
+        self.size = self._clamp(self.size * min(max(factor, 0.5), self._max_growth))
+        return self.size
+
+    def record_failure(self) -> bool:
+        """
+        Halves the page size after a page timed out or was throttled.
+
+        :return: True if the page size was reduced, False if it already was the minimum.
+        """
+        self._max_growth = 1.25
+        size = self._clamp(self.size / 2)
+        reduced = size < self.size
+        self.size = size
+        return reduced
@@ -0,0 +1,146 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import pyarrow as pa
+from shared.item_fetcher import ItemsResult
+from shared.utils.arrow import convert_nodes_to_arrow_table
+
+
+def convert_nodes_to_arrow_ipc(nodes: List[Dict[str, Any]],
+                               columns: List[str],
+                               constant_columns: Optional[Dict[str, Any]],
+                               schema: Optional[pa.Schema]) -> bytes:
+    """
+    Convert a list of nested nodes to an Arrow table and serialize it in the Arrow IPC stream format.
+    Runs in the worker processes of a TransformPool.
+
+    Args:
+    nodes (List[Dict[str, Any]]): The nested nodes, as returned by the GraphQL API.
+    columns (List[str]): The flattened column paths, in the order of the table columns.
+    constant_columns (Optional[Dict[str, Any]]): Values of columns that are the same for every row.
+    schema (Optional[pa.Schema]): The schema of the table.
+
+    Returns:
+    bytes: The table as an Arrow IPC stream.
+    """
+    table = convert_nodes_to_arrow_table(nodes, columns, constant_columns, schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class TransformPool:
+    """
+    Converts pages of items to Arrow tables in a pool of worker processes.
+
+    Converting the nested items of a page to an Arrow table is pure Python work that holds the GIL, so it
+    only uses one core when it runs on a thread. The pool hands the items of each page to a worker process,
+    which converts them and returns the table as an Arrow IPC stream, from which the table is read without
+    copying its buffers. Up to two pages per worker are converted at the same time, and the tables are
+    returned in the order of the pages.
+
+    The workers are started with the spawn method, so they do not inherit the locks held by the other threads
+    of the Functions worker. The items are pickled to the workers, which costs the calling process about as much
+    as converting them with the compiled field extractor, so the pool only pays off on plans with several cores
+    and entities with many typed (decimal, date, timestamp) columns. Measure with scripts/benchmark_transform_workers.py.
+
+    Attributes:
+    workers (int): The number of worker processes.
+    columns (List[str]): The flattened column paths, in the order of the table columns.
+    constant_columns (Optional[Dict[str, Any]]): Values of columns that are the same for every row.
+    schema (Optional[pa.Schema]): The schema of the tables.
+    """
+
+    def __init__(self,
+                 workers: int,
+                 columns: List[str],
+                 constant_columns: Optional[Dict[str, Any]] = None,
+                 schema: Optional[pa.Schema] = None) -> None:
+        """
+        Initialize a new instance of TransformPool. The worker processes are started when the pool is entered.
+
+        Args:
+        workers (int): The number of worker processes.
+        columns (List[str]): The flattened column paths, in the order of the table columns.
+        constant_columns (Optional[Dict[str, Any]]): Values of columns that are the same for every row.
+        schema (Optional[pa.Schema]): The schema of the tables. Defaults to inferring the column types.
+        """
+        self.workers = max(1, workers)
+        self.columns = columns
+        self.constant_columns = constant_columns
+        self.schema = schema
+        self._executor = None
+
+    def __enter__(self):
+        """
+        Start the worker processes.
+        """
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Stop the worker processes, cancelling the conversions that have not started.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def convert(self, nodes: List[Dict[str, Any]]) -> Future:
+        """
+        Start converting a list of nested nodes to an Arrow table in a worker process.
+
+        Args:
+        nodes (List[Dict[str, Any]]): The nested nodes.
+
+        Returns:
+        Future: The future of the table as an Arrow IPC stream, read with read_table.
+        """
+        if self._executor is None:
+            raise RuntimeError("The transform pool must be entered before converting nodes.")
+        return self._executor.submit(convert_nodes_to_arrow_ipc, nodes, self.columns, self.constant_columns, self.schema)
+
+    @staticmethod
+    def read_table(buffer: bytes) -> pa.Table:
+        """
+        Read a table converted by a worker process.
+
+        Args:
+        buffer (bytes): The table as an Arrow IPC stream.
+
+        Returns:
+        pa.Table: The table.
+        """
+        return pa.ipc.open_stream(buffer).read_all()
+
+    def map_pages(self, pages: Iterable[ItemsResult]) -> Iterator[Tuple[pa.Table, str]]:
+        """
+        Convert pages of items to Arrow tables, with up to two pages per worker converted at the same time.
+
+        Args:
+        pages (Iterable[ItemsResult]): The pages of items.
+
+        Yields:
+        Tuple[pa.Table, str]: The table of each page and the cursor of its last item, in the order of the pages.
+
+        Raises:
+        Exception: The exception raised by the pages, after the tables of the pages before it.
+        """
+        pending = deque()
+        error = None
+        try:
+            for page in pages:
+                pending.append((self.convert(page.get_items()), page.get_last_item_cursor()))
+                if len(pending) >= 2 * self.workers:
+                    future, cursor = pending.popleft()
+                    yield self.read_table(future.result()), cursor
+        except Exception as e:
+            # Return the pages fetched before the failure first, so they can still be written.
+            error = e
+
+        while pending:
+            future, cursor = pending.popleft()
+            yield self.read_table(future.result()), cursor
+        if error:
+            raise error
@@ -0,0 +1,141 @@
+import logging
+from datetime import date, datetime, timezone
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Any, Dict, List, Optional
+import pyarrow as pa
+from shared.utils.data_transformation import compile_field_extractor
+
+
+# Column types for the COLUMN_TYPES of the entities. Columns without a declared type are strings.
+STRING = pa.string()
+INT64 = pa.int64()
+BOOLEAN = pa.bool_()
+DECIMAL = pa.decimal128(28, 6)
+RATE = pa.decimal128(28, 10)
+DATE = pa.date32()
+TIMESTAMP = pa.timestamp("ms", tz="UTC")
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+
+def build_arrow_schema(columns: List[str], column_types: Optional[Dict[str, pa.DataType]] = None) -> pa.Schema:
+    """
+    Build the Arrow schema for a list of columns. Columns without a declared type are strings.
+
+    Parameters:
+        columns (List[str]): The flattened column paths, in the order of the table columns.
+        column_types (Optional[Dict[str, pa.DataType]]): The type of each column with a non-string type.
+
+    Returns:
+        pa.Schema: The schema.
+    """
+    column_types = column_types or {}
+    unknown = [column for column in column_types if column not in columns]
+    if unknown:
+        raise ValueError(f"Types declared for unknown columns: {', '.join(unknown)}.")
+    return pa.schema([pa.field(column, column_types.get(column, STRING)) for column in columns])
+
+
+def _parse_timestamp(value: Any) -> Any:
+    """
+    Parse an ISO 8601 date and time. Values without a time zone are taken to be UTC.
+    """
+    if not isinstance(value, str):
+        return value
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_date(value: Any) -> Any:
+    """
+    Parse an ISO 8601 date, ignoring the time of a date and time.
+    """
+    return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+
+
+def to_arrow_array(values: List[Any], arrow_type: pa.DataType, column: str = '') -> pa.Array:
+    """
+    Convert the values of a column, as returned by the GraphQL API, to an Arrow array of a fixed type.
+
+    Decimals are converted from their string representation, so no precision is lost to floats, and
+    values with more decimals than the scale of the type are rounded. Dates and timestamps are parsed from
+    ISO 8601 strings, integers may be given as strings (Int64String) and other values are converted to
+    strings when the type is a string.
+
+    Parameters:
+        values (List[Any]): The values of the column.
+        arrow_type (pa.DataType): The type of the column.
+        column (str): The name of the column, for error messages.
+
+    Returns:
+        pa.Array: The array.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return to_arrow_array(values, arrow_type.value_type, column).dictionary_encode()
+
+    if pa.types.is_decimal(arrow_type):
+        values = [None if value is None else Decimal(str(value)) for value in values]
+        try:
+            return pa.array(values, type=arrow_type)
+        except pa.ArrowInvalid:
+            logging.warning(f"Rounding values of column '{column}' to {arrow_type.scale} decimals.")
+            exponent = Decimal(1).scaleb(-arrow_type.scale)
+            values = [None if value is None else value.quantize(exponent, ROUND_HALF_EVEN) for value in values]
+    elif pa.types.is_timestamp(arrow_type):
+        values = [_parse_timestamp(value) for value in values]
+    elif pa.types.is_date(arrow_type):
+        values = [_parse_date(value) for value in values]
+    elif pa.types.is_integer(arrow_type):
+        values = [int(value) if isinstance(value, str) else value for value in values]
+    elif pa.types.is_string(arrow_type):
+        try:
+            return pa.array(values, type=arrow_type)
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            values = [value if value is None or isinstance(value, str) else str(value) for value in values]
+
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowTypeError, pa.ArrowInvalid, ValueError) as e:
+        raise ValueError(f"Failed to convert column '{column}' to {arrow_type}: {e}") from e
+
+
+def convert_nodes_to_arrow_table(nodes: List[Dict[str, Any]],
+                                 columns: List[str],
+                                 constant_columns: Optional[Dict[str, Any]] = None,
+                                 schema: Optional[pa.Schema] = None,
+                                 separator: str = '.') -> pa.Table:
+    """
+    Convert a list of nested nodes to an Arrow table with one column per flattened column path.
+
+    The nodes are never flattened into per-row dictionaries: the columns are extracted with the compiled
+    extractor for the column paths, and each column is converted straight into an Arrow array. Columns
+    with the same value for every row, such as mutationType, are given in constant_columns instead of
+    being added to every node.
+
+    With a schema, every column is converted to the type in the schema, so tables of different batches
+    and sync runs have identical schemas. Without one, the types are inferred from the values.
+
+    Parameters:
+        nodes (List[Dict[str, Any]]): The nested nodes, as returned by the GraphQL API.
+        columns (List[str]): The flattened column paths, in the order of the table columns.
+        constant_columns (Optional[Dict[str, Any]]): Values of columns that are the same for every row.
+        schema (Optional[pa.Schema]): The schema of the table, e.g. as returned by build_arrow_schema.
+        separator (str): The separator used to denote nesting in the column paths.
+
+    Returns:
+        pa.Table: The table.
+    """
+    constant_columns = constant_columns or {}
+    extractor = compile_field_extractor([column for column in columns if column not in constant_columns], separator)
+    values = extractor.extract(nodes)
+
+    arrays = []
+    for column in columns:
+        column_values = [constant_columns[column]] * len(nodes) if column in constant_columns else values[column]
+        if schema is not None:
+            arrays.append(to_arrow_array(column_values, schema.field(column).type, column))
+        else:
+            arrays.append(pa.array(column_values))
+
+    if schema is not None:
+        return pa.Table.from_arrays(arrays, schema=schema)
+    return pa.Table.from_arrays(arrays, names=columns)
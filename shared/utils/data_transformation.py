@@ -1,4 +1,5 @@
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
 
 
 def flatten_json(nested_json: Dict[str, Any], separator: str = '.') -> Dict[str, Any]:
@@ -35,24 +36,6 @@ def flatten_json(nested_json: Dict[str, Any], separator: str = '.') -> Dict[str,
     return flattened_dict
 
 
-def flatten_list_of_dicts(list_of_dicts: List[Dict[str, Any]], separator: str = '.') -> List[Dict[str, Any]]:
-    """
-    Flattens a list of nested JSON-like dictionaries, applying the flatten_json function to each dictionary.
-
-    Parameters:
-        list_of_dicts (List[Dict[str, Any]]): A list of dictionaries to be flattened.
-        separator (str): The separator used to denote nesting in the keys, passed to flatten_json.
-
-    Returns:
-        List[Dict[str, Any]]: A list of dictionaries where each dictionary has been flattened.
-    """
-    flattened_dicts = []
-    for nested_dict in list_of_dicts:
-        flattened_dict = flatten_json(nested_dict, separator)
-        flattened_dicts.append(flattened_dict)
-    return flattened_dicts
-
-
 def add_key_value_to_dicts(dicts_list: List[Dict[str, Any]], key: str, value: Any) -> List[Dict[str, Any]]:
     """
     Adds a key-value pair to each dictionary in the list at the first level.
@@ -136,4 +119,139 @@ def flatten_graphql_fields(input: str, separator: str = ".") -> List[str]:
             else:
                 fields.append(field)
 
-    return fields
\ No newline at end of file
+    return fields
+
+class FieldExtractor:
+    """
+    Extracts the values of a fixed set of flattened column paths from nested nodes.
+
+    The column paths are compiled once into a Python function with one direct dictionary lookup per
+    path segment, in which every nested object is looked up once for all the columns below it. Unlike
+    flatten_json, no keys are discovered or concatenated at runtime and no per-node dictionary is built:
+    the values are appended straight to one list per column. A missing or null value anywhere along a
+    path gives None.
+
+    Extractors are created with compile_field_extractor, which caches them by their column paths.
+
+    Attributes:
+        columns (Tuple[str, ...]): The flattened column paths, in extraction order.
+        separator (str): The separator used to denote nesting in the column paths.
+    """
+
+    def __init__(self, columns: Tuple[str, ...], separator: str = '.') -> None:
+        """
+        Compile an extractor for the column paths.
+
+        Parameters:
+            columns (Tuple[str, ...]): The flattened column paths, e.g. as returned by flatten_graphql_fields.
+            separator (str): The separator used to denote nesting in the column paths.
+        """
+        self.columns = tuple(columns)
+        self.separator = separator
+        self._extract = self._compile()
+
+    def extract(self, nodes: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """
+        Extract the values of each column from the nodes.
+
+        Parameters:
+            nodes (List[Dict[str, Any]]): The nested nodes, as returned by the GraphQL API.
+
+        Returns:
+            Dict[str, List[Any]]: The values of each column, in the order of the nodes.
+        """
+        return dict(zip(self.columns, self._extract(nodes)))
+
+    def _compile(self) -> Callable[[List[Dict[str, Any]]], List[List[Any]]]:
+        """
+        Generate and compile the extraction function.
+
+        For the columns dbId, owner.dbId and owner.description the generated function is equivalent to:
+
+            def extract(nodes):
+                c0 = []; c1 = []; c2 = []
+                ...
+                for v0 in nodes:
+                    a0(v0.get('dbId'))
+                    v1 = v0.get('owner')
+                    if isinstance(v1, dict):
+                        a1(v1.get('dbId'))
+                        a2(v1.get('description'))
+                    else:
+                        a1(None)
+                        a2(None)
+                return [c0, c1, c2]
+
+        Returns:
+            Callable[[List[Dict[str, Any]]], List[List[Any]]]: The function returning the values of each column.
+        """
+        # Build a tree of path segments, with the column index at each leaf.
+        tree = {}
+        for index, column in enumerate(self.columns):
+            branch = tree
+            *parents, leaf = column.split(self.separator)
+            for segment in parents:
+                branch = branch.setdefault(segment, {})
+                if not isinstance(branch, dict):
+                    raise ValueError(f"Column '{column}' is nested below another column.")
+            if leaf in branch:
+                raise ValueError(f"Column '{column}' is defined more than once or has nested columns.")
+            branch[leaf] = index
+
+        def leaves(branch: Dict[str, Any]) -> List[int]:
+            indices = []
+            for child in branch.values():
+                indices.extend(leaves(child) if isinstance(child, dict) else [child])
+            return indices
+
+        lines = []
+        variables = [0]
+
+        def emit(branch: Dict[str, Any], variable: str, indent: str) -> None:
+            for key, child in branch.items():
+                if isinstance(child, dict):
+                    variables[0] += 1
+                    nested = f"v{variables[0]}"
+                    lines.append(f"{indent}{nested} = {variable}.get({key!r})")
+                    lines.append(f"{indent}if isinstance({nested}, dict):")
+                    emit(child, nested, indent + "    ")
+                    lines.append(f"{indent}else:")
+                    lines.extend(f"{indent}    a{index}(None)" for index in leaves(child))
+                else:
+                    lines.append(f"{indent}a{child}({variable}.get({key!r}))")
+
+        emit(tree, "v0", " " * 8)
+
+        count = len(self.columns)
+        source = "\n".join(
+            ["def extract(nodes):"]
+            + [f"    c{i} = []" for i in range(count)]
+            + [f"    a{i} = c{i}.append" for i in range(count)]
+            + ["    for v0 in nodes:"]
+            + (lines or ["        pass"])
+            + [f"    return [{', '.join(f'c{i}' for i in range(count))}]"]
+        )
+
+        namespace = {}
+        exec(compile(source, f"<field extractor for {count} columns>", "exec"), namespace)
+        return namespace["extract"]
+
+
+def compile_field_extractor(columns: List[str], separator: str = '.') -> FieldExtractor:
+    """
+    Get the compiled extractor for a set of column paths, compiling it on first use.
+    Every call with the same column paths returns the same extractor.
+
+    Parameters:
+        columns (List[str]): The flattened column paths.
+        separator (str): The separator used to denote nesting in the column paths.
+
+    Returns:
+        FieldExtractor: The extractor.
+    """
+    return _cached_field_extractor(tuple(columns), separator)
+
+
+@lru_cache(maxsize=None)
+def _cached_field_extractor(columns: Tuple[str, ...], separator: str) -> FieldExtractor:
+    return FieldExtractor(columns, separator)
@@ -1,6 +1,8 @@
 import io
 import csv
-import pandas as pd
+from typing import Any, Dict, List, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 
 def convert_dicts_to_csv(data: list[dict], separator: str = ';', encoding: str = 'utf-8') -> str:
@@ -53,28 +55,82 @@ def write_buffer_to_file(buffer: io.BytesIO, file_path: str) -> None:
         f.write(buffer.read())
 
 
-def convert_dicts_to_parquet_pandas(data: list[dict], columns: list[str]) -> io.BytesIO:
+class ParquetOptions:
     """
-    Convert a list of dictionaries to a Parquet file stored in a BytesIO buffer.
+    Options for writing Parquet files with pyarrow.
+
+    Attributes:
+    compression (str): The compression codec, e.g. snappy, zstd, gzip or none.
+    compression_level (Optional[int]): The compression level, for codecs that support it (e.g. zstd 1-22).
+    dictionary_columns (Optional[List[str]]): The columns to dictionary-encode, or None for all columns.
+        Columns with an Arrow dictionary type are always dictionary-encoded.
+    row_group_size (Optional[int]): The maximum number of rows per row group, or None for the pyarrow default.
+    statistics_columns (Optional[List[str]]): The columns to write min/max statistics for, or None for all columns.
+    """
+
+    def __init__(self,
+                 compression: str = "snappy",
+                 compression_level: Optional[int] = None,
+                 dictionary_columns: Optional[List[str]] = None,
+                 row_group_size: Optional[int] = None,
+                 statistics_columns: Optional[List[str]] = None) -> None:
+        """
+        Initialize a new instance of ParquetOptions. The defaults are those of pyarrow.
+
+        Parameters:
+        compression (str): The compression codec. Defaults to snappy.
+        compression_level (Optional[int]): The compression level. Defaults to the default level of the codec.
+        dictionary_columns (Optional[List[str]]): The columns to dictionary-encode. Defaults to all columns.
+        row_group_size (Optional[int]): The maximum number of rows per row group. Defaults to the pyarrow default.
+        statistics_columns (Optional[List[str]]): The columns to write statistics for. Defaults to all columns.
+        """
+        self.compression = compression
+        self.compression_level = compression_level
+        self.dictionary_columns = dictionary_columns
+        self.row_group_size = row_group_size
+        self.statistics_columns = statistics_columns
+
+    def to_write_table_kwargs(self, schema: pa.Schema) -> Dict[str, Any]:
+        """
+        Get the keyword arguments of pyarrow.parquet.write_table for a table.
+
+        Parameters:
+        schema (pa.Schema): The schema of the table.
+
+        Returns:
+        Dict[str, Any]: The keyword arguments.
+        """
+        kwargs = {"compression": self.compression}
+        if self.compression_level is not None:
+            kwargs["compression_level"] = self.compression_level
+        if self.dictionary_columns is not None:
+            dictionary_typed = [field.name for field in schema if pa.types.is_dictionary(field.type)]
+            kwargs["use_dictionary"] = list(dict.fromkeys(list(self.dictionary_columns) + dictionary_typed))
+        if self.row_group_size is not None:
+            kwargs["row_group_size"] = self.row_group_size
+        if self.statistics_columns is not None:
+            kwargs["write_statistics"] = list(self.statistics_columns)
+        return kwargs
+
+
+def convert_arrow_table_to_parquet(table: pa.Table, options: Optional[ParquetOptions] = None) -> io.BytesIO:
+    """
+    Convert an Arrow table to a Parquet file stored in a BytesIO buffer.
 
     Parameters:
-    data (list[dict]): A list of dictionaries containing the data.
-    columns (list[str]): A list of column names to include in the DataFrame.
+    table (pa.Table): The table containing the data.
+    options (Optional[ParquetOptions]): The options for writing the file. Defaults to the pyarrow defaults.
 
     Returns:
     io.BytesIO: A BytesIO buffer containing the Parquet file.
     """
-    # Create a DataFrame from the list of dictionaries, including only specified columns.
-    df = pd.DataFrame(data, columns=columns)
-    
-    # Create a BytesIO buffer to hold the Parquet data.
+    options = options or ParquetOptions()
+
+    # Write the table to the buffer in Parquet format.
     buffer = io.BytesIO()
-    
-    # Write the DataFrame to the buffer in Parquet format, excluding the index.
-    df.to_parquet(buffer, engine='pyarrow', index=False)
-    
+    pq.write_table(table, buffer, **options.to_write_table_kwargs(table.schema))
+
     # Reset the buffer's position to the beginning.
     buffer.seek(0)
-    
-    # Return the buffer containing the Parquet data.
+
     return buffer
@@ -1,3 +1,4 @@
+import re
 from datetime import datetime
 
 
@@ -38,4 +39,23 @@ def get_current_time_for_filename():
     """
     current_time = datetime.now()
     formatted_time = current_time.strftime('%Y%m%d_%H_%M_%S')
-    return formatted_time
\ No newline at end of file
+    return formatted_time
+
+def parse_time_from_filename(file_name: str) -> datetime:
+    """
+    Parses the timestamp in a file name created with get_current_time_for_filename.
+
+    Args:
+        file_name (str): A file name containing a timestamp formatted as 'YYYYMMDD_HH_MM_SS',
+            e.g. 'sync_changes-20240712_21_17_09-timesheets.parquet'.
+
+    Returns:
+        datetime: The parsed timestamp.
+
+    Raises:
+        ValueError: If the file name does not contain a timestamp.
+    """
+    match = re.search(r'\d{8}_\d{2}_\d{2}_\d{2}', file_name)
+    if not match:
+        raise ValueError(f"No timestamp found in file name '{file_name}'.")
+    return datetime.strptime(match.group(0), '%Y%m%d_%H_%M_%S')